@@ -0,0 +1,198 @@
+# Аналитические оценки для СМО с c каналами и очередью на K мест
+# Точное решение M/M/c/K и двухмоментное приближение M/G/c/K по тем же
+# параметрам, что и у SMOSimulation. Оценки считаются за микросекунды и
+# нужны, чтобы заранее выбрать длину прогона и число повторов
+
+import math
+from collections import namedtuple
+import numpy as np
+
+
+QueueEstimate = namedtuple(
+    "QueueEstimate",
+    ("model", "arrival_rate", "service_mean", "service_scv", "load",
+     "blocking", "queue_mean", "wait_mean", "wait_probability", "throughput")
+)
+
+
+def tick_rates(lambda_rate: float, service_min: int, service_max: int,
+               ticks_per_second: int = 100):
+    """
+    Интенсивности в тиках с учётом дискретизации модели: интервал —
+    round(Exp) + 1 тиков, обслуживание — max(s, 1) тиков при s равномерном
+    на [service_min, service_max]. Возвращает (интенсивность потока в заявках
+    за тик, среднее обслуживание, квадрат коэффициента вариации обслуживания).
+    """
+    m = ticks_per_second / lambda_rate
+    # E[round(X)] для X ~ Exp со средним m: сумма P(X >= k - 0.5)
+    gap_mean = math.exp(0.5 / m) / math.expm1(1.0 / m) + 1.0
+    services = np.maximum(np.arange(service_min, service_max + 1), 1)
+    service_mean = float(services.mean())
+    service_scv = float(services.var() / service_mean ** 2)
+    return 1.0 / gap_mean, service_mean, service_scv
+
+
+def _birth_death(arrival_rate: float, service_mean: float, servers: int, queue_length: int):
+    # Стационарное распределение числа заявок 0..c+K в M/M/c/K.
+    # Возвращает (отказы, средняя очередь, вероятность ожидания для принятой заявки)
+    a = arrival_rate * service_mean
+    n = np.arange(servers + queue_length + 1)
+    # Логарифмы весов, чтобы не переполниться при больших c и K
+    log_busy = n[:servers + 1] * math.log(a) - np.array([math.lgamma(k + 1) for k in range(servers + 1)])
+    log_queue = log_busy[-1] + math.log(a / servers) * np.arange(1, queue_length + 1)
+    log_weights = np.concatenate((log_busy, log_queue))
+    p = np.exp(log_weights - log_weights.max())
+    p /= p.sum()
+
+    blocking = float(p[-1])
+    queue_mean = float((p[servers + 1:] * np.arange(1, queue_length + 1)).sum())
+    wait_probability = float(p[servers:-1].sum() / (1.0 - blocking)) if blocking < 1 else 1.0
+    return blocking, queue_mean, wait_probability
+
+
+def _estimate(model: str, arrival_rate: float, service_mean: float, service_scv: float,
+              servers: int, blocking: float, queue_mean: float, wait_probability: float):
+    throughput = arrival_rate * (1.0 - blocking)
+    return QueueEstimate(
+        model=model,
+        arrival_rate=arrival_rate,
+        service_mean=service_mean,
+        service_scv=service_scv,
+        load=arrival_rate * service_mean / servers,
+        blocking=blocking,
+        queue_mean=queue_mean,
+        wait_mean=queue_mean / throughput if throughput > 0 else math.inf,  # Формула Литтла
+        wait_probability=wait_probability,
+        throughput=throughput,
+    )
+
+
+def mmck(arrival_rate: float, service_mean: float, servers: int, queue_length: int) -> QueueEstimate:
+    # Точное решение M/M/c/K (процесс рождения и гибели); времена — в единицах service_mean
+    metrics = _birth_death(arrival_rate, service_mean, servers, queue_length)
+    return _estimate("M/M/c/K", arrival_rate, service_mean, 1.0, servers, *metrics)
+
+
+def mgck(arrival_rate: float, service_mean: float, service_scv: float,
+         servers: int, queue_length: int) -> QueueEstimate:
+    """
+    Двухмоментное приближение M/G/c/K: в диффузионном приближении очередь
+    ведёт себя как у M/M/c/K, но одна заявка весит (1 + scv) / 2 «экспоненциальных».
+    Поэтому считается M/M/c/K с очередью K·2 / (1 + scv) (дробная — линейной
+    интерполяцией между соседними целыми), а длина очереди пересчитывается обратно.
+    При scv = 1 совпадает с точным M/M/c/K.
+    """
+    scale = 2.0 / (1.0 + service_scv)
+    effective = queue_length * scale
+    low = int(math.floor(effective))
+    weight = effective - low
+    metrics = np.array(_birth_death(arrival_rate, service_mean, servers, low))
+    if weight > 0:
+        high = np.array(_birth_death(arrival_rate, service_mean, servers, low + 1))
+        metrics = (1 - weight) * metrics + weight * high
+    blocking, queue_mean, wait_probability = metrics.tolist()
+    return _estimate("M/G/c/K", arrival_rate, service_mean, service_scv, servers,
+                     blocking, queue_mean / scale, wait_probability)
+
+
+def analyze(lambda_rate: float, service_min: int, service_max: int, queue_length: int,
+            num_processors: int, ticks_per_second: int = 100, **_) -> dict:
+    # Те же параметры, что у SMOSimulation (лишние, например total_ticks, игнорируются).
+    # Времена в результатах — в тиках
+    arrival_rate, service_mean, service_scv = tick_rates(
+        lambda_rate, service_min, service_max, ticks_per_second)
+    return {
+        "mmck": mmck(arrival_rate, service_mean, num_processors, queue_length),
+        "mgck": mgck(arrival_rate, service_mean, service_scv, num_processors, queue_length),
+    }
+
+
+def relaxation_ticks(estimate: QueueEstimate, servers: int, queue_length: int) -> float:
+    # Время релаксации очереди: 1 / (c·mu·(1 - sqrt(rho))²) (Уитт); при перегрузке
+    # очередь так же быстро уходит к верхней границе — берём 1 / rho.
+    # И не дольше времени диффузии через все c + K состояний
+    per_server = estimate.service_mean / servers
+    bounded = (servers + queue_length + 1) ** 2 * per_server
+    load = min(estimate.load, 1.0 / estimate.load)
+    if load < 1:
+        return min(per_server / (1 - math.sqrt(load)) ** 2, bounded)
+    return bounded
+
+
+def plan(params: dict, rel_half_width: float = 0.05, confidence: float = 0.95,
+         min_replications: int = 5, relaxations: int = 50, min_arrivals: int = 1000) -> dict:
+    """
+    Длина прогона и число повторов по аналитической оценке:
+    разогрев — 3 времени релаксации, прогон — ещё relaxations времён релаксации
+    (и не меньше min_arrivals заявок), повторов — столько, чтобы полуширина
+    интервала среднего времени пребывания (ожидание + обслуживание) составила
+    rel_half_width от оценки (но не меньше min_replications).
+    """
+    from scipy import stats
+
+    servers, queue_length = params["num_processors"], params["queue_length"]
+    estimate = analyze(**params)["mgck"]
+    relax = relaxation_ticks(estimate, servers, queue_length)
+    warmup_ticks = int(math.ceil(3 * relax))
+    run_ticks = int(math.ceil(max(relaxations * relax, min_arrivals / estimate.arrival_rate)))
+
+    # Ожидание: с вероятностью P(wait) экспоненциальное со средним Wq / P(wait), иначе 0;
+    # обслуживание от него не зависит
+    wait, service = estimate.wait_mean, estimate.service_mean
+    wait_square = 2 * wait * wait / estimate.wait_probability if estimate.wait_probability > 0 else 0.0
+    variance = wait_square - wait * wait + estimate.service_scv * service * service
+    cv2 = variance / (wait + service) ** 2
+    z = stats.norm.ppf((1 + confidence) / 2)
+    needed = (z / rel_half_width) ** 2 * cv2
+    # Независимых наблюдений за прогон: не больше заявок и не больше
+    # числа отрезков длиной в две релаксации
+    per_replication = max(min(estimate.throughput * run_ticks, run_ticks / (2 * relax)), 1.0)
+    replications = max(min_replications, int(math.ceil(needed / per_replication)))
+    return {
+        "estimate": estimate,
+        "relaxation_ticks": relax,
+        "warmup_ticks": warmup_ticks,
+        "total_ticks": warmup_ticks + run_ticks,
+        "replications": replications,
+    }
+
+
+def run_planned(params: dict, rel_half_width: float = 0.05, confidence: float = 0.95,
+                master_seed: int = 0, workers: int = 1) -> dict:
+    # Повторы по плану: разогрев считается один раз, снимок установившегося
+    # режима — общий старт для всех повторов длиной total_ticks - warmup_ticks
+    from simulation import SMOSimulation, ENGINE_EVENT
+    from random_source import block_source
+    from replications import run_replications
+
+    run = plan(params, rel_half_width, confidence)
+    warmup = SMOSimulation(**{**params, "total_ticks": run["warmup_ticks"]}, engine=ENGINE_EVENT,
+                           keep_requests=False, source=block_source(params, master_seed))
+    warmup.run()
+    summary = run_replications({**params, "total_ticks": run["total_ticks"] - run["warmup_ticks"]},
+                               run["replications"], master_seed=master_seed, workers=workers,
+                               confidence=confidence, snapshot=warmup.snapshot())
+    summary["plan"] = run
+    return summary
+
+
+def print_estimate(estimate: QueueEstimate, ticks_per_second: int = 100):
+    print(f"  {estimate.model}: загрузка {estimate.load:.3f}, "
+          f"отказы {estimate.blocking:.4f}, очередь {estimate.queue_mean:.2f}, "
+          f"ожидание {estimate.wait_mean:.1f} тиков (~{estimate.wait_mean / ticks_per_second:.2f} сек)")
+
+
+def main():
+    # Параметры по умолчанию (без длительности — её даёт план)
+    from simulation import BASE_PARAMS
+    params = {k: v for k, v in BASE_PARAMS.items() if k != "total_ticks"}
+    print("АНАЛИТИЧЕСКАЯ ОЦЕНКА:")
+    for estimate in analyze(**params).values():
+        print_estimate(estimate)
+    run = plan(params)
+    print(f"Разогрев {run['warmup_ticks']} тиков, прогон {run['total_ticks']} тиков, "
+          f"повторов {run['replications']}")
+
+
+if __name__ == "__main__":
+    main()
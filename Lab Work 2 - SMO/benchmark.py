@@ -0,0 +1,199 @@
+# Замеры скорости СМО и контроль регрессий
+# Сценарии с фиксированным сидом на разных масштабах: скорость (тики/с, заявки/с),
+# пиковая память и контрольная сумма результата. Базовый замер хранится в JSON,
+# compare завершается с ошибкой, если скорость упала или статистика сдвинулась
+#
+#   python benchmark.py run                 — замер и печать
+#   python benchmark.py baseline            — замер и сохранение базового файла
+#   python benchmark.py compare             — замер и сравнение с базовым файлом
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import platform
+import sys
+import time
+import numpy as np
+
+from simulation import SMOSimulation, ENGINE_EVENT, ENGINES, ENGINE_VERSION, BASE_PARAMS, summarize
+from random_source import block_source
+
+try:
+    import resource
+except ImportError:  # Windows — пиковую память не меряем
+    resource = None
+
+
+DEFAULT_BASELINE = "bench_baseline.json"
+SEED = 12345
+
+# Масштабы по числу тиков: quick — для каждого изменения, full — перед релизом
+SUITES = {
+    "quick": (10 ** 5, 10 ** 6),
+    "full": (10 ** 5, 10 ** 6, 10 ** 7, 10 ** 8),
+}
+PROCESSORS = (1, 8, 64)
+LOADS = {"light": 0.5, "saturated": 1.5}  # Загрузка rho = lambda·E[S] / c
+
+
+def scenarios(suite: str):
+    # Обслуживание 1..16 с (в среднем 8.5 с), интенсивность подобрана под загрузку
+    for ticks in SUITES[suite]:
+        for processors in PROCESSORS:
+            for load_name, load in LOADS.items():
+                yield {
+                    "name": f"{load_name}-c{processors}-t{ticks:.0e}",
+                    "params": dict(
+                        BASE_PARAMS,
+                        total_ticks=ticks,
+                        lambda_rate=load * processors / 8.5,
+                        num_processors=processors
+                    ),
+                }
+
+
+def checksum(stats: dict) -> str:
+    # Хеш счётчиков, рядов и моментов ожидания — любая смена траектории его меняет
+    digest = hashlib.sha256()
+    for key in ("processed", "rejected", "in_queue", "in_processors"):
+        digest.update(str(stats[key]).encode())
+    for key in ("queue_history", "completed_history", "rejected_history"):
+        digest.update(np.ascontiguousarray(stats[key].ticks).tobytes())
+        digest.update(np.ascontiguousarray(stats[key].values).tobytes())
+    wait = stats["wait_stats"]
+    if wait:
+        digest.update(repr((wait.nobs, wait.minmax, round(wait.mean, 6))).encode())
+    return digest.hexdigest()
+
+
+def _peak_memory_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux — килобайты, macOS — байты
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+def run_scenario(task) -> dict:
+    scenario, engine, repeat = task
+    params = scenario["params"]
+    best = None
+    for _ in range(repeat):
+        sim = SMOSimulation(**params, engine=engine, keep_requests=False,
+                            source=block_source(params, SEED))
+        start = time.perf_counter()
+        sim.run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    stats = sim.get_stats()
+    arrived = sim.request_counter
+    return {
+        "params": params,
+        "seconds": best,
+        "ticks_per_s": params["total_ticks"] / best,
+        "requests_per_s": arrived / best,
+        "peak_rss_mb": _peak_memory_mb(),
+        "checksum": checksum(stats),
+        "stats": summarize(stats),
+    }
+
+
+def run_suite(suite: str = "quick", engine: str = ENGINE_EVENT, repeat: int = 1,
+              only: str = None) -> dict:
+    """
+    Каждый сценарий — в отдельном свежем процессе, чтобы пиковая память
+    относилась к нему одному. only — подстрока имени для выбора сценариев.
+    """
+    chosen = [s for s in scenarios(suite) if only is None or only in s["name"]]
+    tasks = [(scenario, engine, repeat) for scenario in chosen]
+    results = {}
+    with multiprocessing.Pool(1, maxtasksperchild=1) as pool:
+        for scenario, result in zip(chosen, pool.imap(run_scenario, tasks, chunksize=1)):
+            results[scenario["name"]] = result
+            print(f"  {scenario['name']:24s} {result['ticks_per_s']:14,.0f} тиков/с "
+                  f"{result['requests_per_s']:12,.0f} заявок/с  "
+                  f"{result['peak_rss_mb'] or 0:8.1f} МБ", flush=True)
+    return {
+        "engine": engine,
+        "engine_version": ENGINE_VERSION,
+        "suite": suite,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "scenarios": results,
+    }
+
+
+def compare(current: dict, baseline: dict, speed_tolerance: float = 0.2,
+            stat_tolerance: float = 1e-6) -> list:
+    """
+    Список проблем (пустой — всё в порядке):
+    скорость ниже базовой больше чем на speed_tolerance (доля),
+    показатели разошлись больше чем на stat_tolerance (относительно).
+    Несовпадение контрольной суммы само по себе не ошибка — траектория
+    может законно смениться (например, при новом ENGINE_VERSION).
+    """
+    problems = []
+    if current["engine"] != baseline["engine"]:
+        problems.append(f"движок {current['engine']}, в базовом замере {baseline['engine']}")
+    for name, result in current["scenarios"].items():
+        reference = baseline["scenarios"].get(name)
+        if reference is None:
+            continue
+        if result["ticks_per_s"] < reference["ticks_per_s"] * (1 - speed_tolerance):
+            problems.append(f"{name}: скорость {result['ticks_per_s']:,.0f} тиков/с, "
+                            f"база {reference['ticks_per_s']:,.0f}")
+        for key, value in result["stats"].items():
+            # Показатель, которого нет в базовом замере (сводка расширилась), не сравнивается
+            if key not in reference["stats"]:
+                continue
+            expected = reference["stats"][key]
+            if value is None or expected is None:
+                if value != expected:
+                    problems.append(f"{name}: {key} = {value}, база {expected}")
+            elif not np.isclose(value, expected, rtol=stat_tolerance, atol=0):
+                problems.append(f"{name}: {key} = {value}, база {expected}")
+        if result["checksum"] != reference["checksum"]:
+            print(f"  {name}: контрольная сумма изменилась")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Замеры скорости СМО")
+    parser.add_argument("command", choices=("run", "baseline", "compare"))
+    parser.add_argument("--suite", choices=tuple(SUITES), default="quick")
+    parser.add_argument("--engine", choices=ENGINES, default=ENGINE_EVENT)
+    parser.add_argument("--repeat", type=int, default=1, help="повторов на сценарий (берётся лучший)")
+    parser.add_argument("--only", help="подстрока имени сценария")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--output", help="сохранить результаты в JSON")
+    parser.add_argument("--speed-tolerance", type=float, default=0.2)
+    parser.add_argument("--stat-tolerance", type=float, default=1e-6)
+    args = parser.parse_args(argv)
+
+    print(f"Сценарии {args.suite}, движок {args.engine}:")
+    current = run_suite(args.suite, args.engine, args.repeat, args.only)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+
+    if args.command == "baseline":
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(current, f, indent=2)
+        print(f"Базовый замер сохранён в {args.baseline}")
+    elif args.command == "compare":
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        problems = compare(current, baseline, args.speed_tolerance, args.stat_tolerance)
+        for problem in problems:
+            print("  РЕГРЕССИЯ:", problem)
+        if problems:
+            return 1
+        print("Регрессий нет")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
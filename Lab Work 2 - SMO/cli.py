@@ -0,0 +1,167 @@
+# Запуск имитации из командной строки — для пакетных заданий
+# Параметры — аргументами или файлом конфигурации (JSON/TOML), результат —
+# в JSON, CSV или NPZ. Тяжёлые модули (numpy, matplotlib) импортируются только
+# после разбора аргументов и только когда нужны: --help и ошибки в аргументах
+# не платят за них, а графики рисуются лишь при --plot. Нижняя граница запуска
+# настоящего задания — интерпретатор плюс импорт numpy (замеры — в README)
+#
+#   python cli.py --lambda-rate 0.5 --seed 1 --output stats.json
+#   python cli.py --config smo.toml --output stats.npz --plot smo.png
+
+import argparse
+import os
+import sys
+
+
+FORMATS = ("json", "csv", "npz")
+
+
+def load_config(path: str) -> dict:
+    # Плоский словарь параметров; формат — по расширению (.toml или JSON)
+    if path.endswith(".toml"):
+        import tomllib
+        with open(path, "rb") as f:
+            return tomllib.load(f)
+    import json
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Имитация СМО без графического интерфейса")
+    parser.add_argument("--config", help="файл параметров .json или .toml")
+    parser.add_argument("--total-ticks", type=int)
+    parser.add_argument("--lambda-rate", type=float)
+    parser.add_argument("--service-min", type=int)
+    parser.add_argument("--service-max", type=int)
+    parser.add_argument("--queue-length", type=int)
+    parser.add_argument("--num-processors", type=int)
+    parser.add_argument("--ticks-per-second", type=int)
+    parser.add_argument("--engine", choices=("tick", "event", "vector"))
+    parser.add_argument("--seed", type=int, help="сид блочного источника (без него — модуль random)")
+    parser.add_argument("--output", help="файл результата: .json, .csv или .npz")
+    parser.add_argument("--format", choices=FORMATS, help="формат, если не по расширению")
+    parser.add_argument("--plot", help="сохранить графики в файл (.png, .svg)")
+    parser.add_argument("--trace", help="записать трассу заявок в файл (request_trace.read_trace)")
+    parser.add_argument("--summary", action="store_true", help="напечатать отчёт в консоль")
+    args = parser.parse_args(argv)
+
+    # Приоритет: аргументы > файл конфигурации > значения по умолчанию.
+    # Умолчания — simulation.BASE_PARAMS; импорт после разбора, --help за него не платит
+    from simulation import BASE_PARAMS, ENGINE_EVENT
+    defaults = dict(BASE_PARAMS, engine=ENGINE_EVENT, seed=None)
+    params = dict(defaults)
+    if args.config:
+        config = load_config(args.config)
+        unknown = set(config) - set(defaults)
+        if unknown:
+            parser.error(f"неизвестные параметры в {args.config}: {', '.join(sorted(unknown))}")
+        params.update(config)
+    for name in defaults:
+        value = getattr(args, name)
+        if value is not None:
+            params[name] = value
+
+    output_format = args.format
+    if args.output and output_format is None:
+        output_format = os.path.splitext(args.output)[1].lstrip(".").lower()
+        if output_format not in FORMATS:
+            parser.error(f"не удалось определить формат по имени {args.output!r}, укажите --format")
+    return params, args, output_format
+
+
+def _finite(value):
+    # NaN и бесконечности (нет наблюдений, дисперсия по одному) — None:
+    # иначе JSON получает голое NaN, которое строгие разборщики не принимают
+    if value is None:
+        return None
+    value = float(value)
+    return value if value == value and abs(value) != float("inf") else None
+
+
+def summary_row(params: dict, stats: dict) -> dict:
+    # Плоская сводка: параметры и скалярные показатели (для JSON и строки CSV)
+    # Показатели — simulation.summarize, как у прогонов и перебора; квантили
+    # ожидания в ней есть всегда (у vector — None): схема одна для всех движков
+    from simulation import summarize
+    row = dict(params)
+    row["in_queue"] = stats["in_queue"]
+    row["in_processors"] = stats["in_processors"]
+    for key, value in summarize(stats).items():
+        row[key] = _finite(value) if isinstance(value, float) else value
+    # Подробности describe; service_time_* — чтобы не столкнуться с параметрами service_min/service_max
+    wait = stats["wait_stats"]
+    row["wait_variance"] = _finite(wait.variance) if wait else None
+    row["wait_min"] = _finite(wait.minmax[0]) if wait else None
+    row["wait_max"] = _finite(wait.minmax[1]) if wait else None
+    service = stats["service_stats"]
+    row["service_time_mean"] = _finite(service.mean) if service else None
+    row["service_time_variance"] = _finite(service.variance) if service else None
+    row["service_time_min"] = _finite(service.minmax[0]) if service else None
+    row["service_time_max"] = _finite(service.minmax[1]) if service else None
+    return row
+
+
+def write_output(path: str, output_format: str, params: dict, stats: dict):
+    row = summary_row(params, stats)
+    if output_format == "json":
+        import json
+        counts, edges = stats["wait_histogram"]
+        record = {**row, "wait_histogram": {"counts": counts.tolist(), "edges": edges.tolist()}}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(record, f, indent=2, allow_nan=False)
+    elif output_format == "csv":
+        # Одна строка с заголовком — файлы многих заданий легко склеить
+        import csv
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=list(row))
+            writer.writeheader()
+            writer.writerow(row)
+    else:
+        # NPZ: сводка и ряды целиком (точки изменения), без pickle
+        import numpy as np
+        arrays = {f"summary_{k}": np.asarray(np.nan if v is None else v) for k, v in row.items()}
+        counts, edges = stats["wait_histogram"]
+        arrays["wait_histogram_counts"] = counts
+        arrays["wait_histogram_edges"] = edges
+        for key in ("queue_history", "completed_history", "rejected_history"):
+            arrays[f"{key}_ticks"] = stats[key].ticks
+            arrays[f"{key}_values"] = stats[key].values
+        np.savez_compressed(path, **arrays)
+
+
+def main(argv=None) -> int:
+    params, args, output_format = parse_args(argv)
+
+    from simulation import SMOSimulation
+    sim_params = {k: v for k, v in params.items() if k not in ("engine", "seed")}
+    source = None
+    if params["seed"] is not None:
+        from random_source import block_source
+        source = block_source(sim_params, params["seed"])
+    trace = None
+    if args.trace:
+        from request_trace import TraceWriter
+        trace = TraceWriter(args.trace)
+    sim = SMOSimulation(**sim_params, engine=params["engine"], keep_requests=False,
+                        source=source, trace=trace)
+    try:
+        sim.run()
+    finally:
+        if trace is not None:
+            trace.close()
+    stats = sim.get_stats()
+
+    if args.output:
+        write_output(args.output, output_format, params, stats)
+    if args.summary:
+        from plot_results import print_summary
+        print_summary(stats)
+    if args.plot:
+        from plot_results import plot_simulation
+        plot_simulation(stats, path=args.plot)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
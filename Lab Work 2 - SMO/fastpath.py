@@ -0,0 +1,224 @@
+# Быстрый путь для FIFO СМО без приоритетов
+# Интервалы и времена обслуживания заранее вытягиваются большими блоками,
+# а моменты начала и конца обслуживания считаются рекуррентно по вектору
+# освобождения каналов (рекурсия Кифера–Вольфовица) с правилом отказа
+# по длине очереди. Блоки обрабатываются по очереди, память ограничена
+
+import heapq
+import numpy as np
+
+from history import ChangePointSeries
+from online_stats import StreamingStats
+
+
+class FifoFastPath:
+    """
+    Состояние быстрого пути между блоками.
+    Семантика тиков та же, что у SMOSimulation: заявка, пришедшая в тик a,
+    может начать обслуживаться не раньше a + 1, канал, освободившийся
+    в тик t, в том же тике берёт следующую заявку.
+    """
+
+    def __init__(self, total_ticks: int, num_processors: int, queue_length: int):
+        self.total_ticks = total_ticks
+        self.queue_length = queue_length
+        self.servers = [0] * num_processors  # Куча тиков освобождения каналов
+        self.queued_starts = []              # Начала принятых заявок, которые могут быть в очереди
+        self.next_arrival = 0                # Тик следующего прихода
+        self.request_counter = 0
+        self.completed_count = 0
+        self.rejected_count = 0
+        self.done = False
+        self.trace = None  # request_trace.TraceWriter — записи блоками
+        # Значения последнего блока за горизонтом — их можно вернуть источнику
+        self.leftover = (np.empty(0, np.int64), np.empty(0, np.int64))
+
+        # Квантили P² поэлементные и медленные — здесь только моменты и гистограмма
+        self.wait_stats = StreamingStats(quantiles=())
+        self.service_stats = StreamingStats(quantiles=())
+        self.queue_history = ChangePointSeries()
+        self.completed_history = ChangePointSeries()
+        self.rejected_history = ChangePointSeries()
+
+        # События после границы блока ещё могут перемешаться со следующим блоком
+        self._pending_queue = (np.empty(0, np.int64), np.empty(0, np.int64))
+        self._pending_finish = np.empty(0, np.int64)
+        # Заявки, которые на границе блока ещё в системе: id, приход, обслуживание, начало, конец
+        self.live = np.empty((0, 5), dtype=np.int64)
+
+    def resume(self, start_tick: int, next_arrival: int, busy: list, queued: list):
+        # Продолжение с тика start_tick: busy — (id, приход, обслуживание, начало, конец)
+        # заявок в каналах, queued — (id, приход, обслуживание) заявок очереди по порядку
+        self.next_arrival = next_arrival
+        self.servers = sorted([record[4] for record in busy]
+                              + [0] * (len(self.servers) - len(busy)))
+        records = [tuple(record) for record in busy]
+        queue_starts = []
+        for req_id, arrival, service in queued:
+            free = self.servers[0]
+            start = start_tick if start_tick > free else free
+            finish = start + max(service, 1)
+            heapq.heapreplace(self.servers, finish)
+            self.queued_starts.append(start)
+            queue_starts.append(start)
+            records.append((req_id, arrival, service, start, finish))
+        records = np.array(records, dtype=np.int64).reshape(-1, 5)
+
+        done = records[:, 4] < self.total_ticks
+        self.wait_stats.add_block((records[:, 3] - records[:, 1] - 1)[done])
+        self.service_stats.add_block(records[:, 2][done])
+        self.completed_count += int(done.sum())
+        if self.trace is not None:
+            finished = records[done]
+            self.trace.add_block(finished[:, 0], finished[:, 1], finished[:, 2],
+                                 finished[:, 3], finished[:, 4], False)
+
+        self._pending_queue = (np.array(queue_starts, dtype=np.int64),
+                               -np.ones(len(queue_starts), dtype=np.int64))
+        self._pending_finish = records[:, 4].copy()
+        self.live = records
+
+    def feed(self, gaps: np.ndarray, services: np.ndarray) -> bool:
+        # Обработать блок; False — горизонт достигнут, блоки больше не нужны
+        if self.done:
+            return False
+        gaps = np.asarray(gaps, dtype=np.int64)
+        services = np.asarray(services, dtype=np.int64)
+        steps = np.cumsum(gaps + 1)
+        arrivals = self.next_arrival + np.concatenate(([0], steps[:-1]))
+        self.next_arrival += int(steps[-1])
+
+        inside = int(np.searchsorted(arrivals, self.total_ticks))
+        if inside < len(arrivals):
+            # Первый приход за горизонтом остаётся следующим
+            self.done = True
+            self.next_arrival = int(arrivals[inside])
+            # Интервал до него уже использован, его обслуживание — ещё нет
+            self.leftover = (gaps[inside:], services[inside:])
+            arrivals, services = arrivals[:inside], services[:inside]
+        ids = self.request_counter + 1 + np.arange(len(arrivals), dtype=np.int64)
+        self.request_counter += len(arrivals)
+
+        accepted, starts, finishes = self._recurse(arrivals, np.maximum(services, 1))
+        rejected = ~accepted
+
+        # Статистика по завершённым в пределах горизонта
+        acc_arrivals = arrivals[accepted]
+        acc_services = services[accepted]
+        done = finishes < self.total_ticks
+        self.wait_stats.add_block((starts - acc_arrivals - 1)[done])
+        self.service_stats.add_block(acc_services[done])
+        self.completed_count += int(done.sum())
+        self.rejected_count += int(rejected.sum())
+        if self.trace is not None:
+            # Обслуженные в пределах горизонта, затем отказы блока
+            skipped = np.full(int(rejected.sum()), -1, dtype=np.int64)
+            self.trace.add_block(
+                np.concatenate((ids[accepted][done], ids[rejected])),
+                np.concatenate((acc_arrivals[done], arrivals[rejected])),
+                np.concatenate((acc_services[done], services[rejected])),
+                np.concatenate((starts[done], skipped)),
+                np.concatenate((finishes[done], skipped)),
+                np.concatenate((np.zeros(int(done.sum()), np.uint8), np.ones(len(skipped), np.uint8))),
+            )
+
+        # Ряды: события до границы окончательны, остальное переносится
+        frontier = self.total_ticks if self.done else self.next_arrival
+        queue_ticks = np.concatenate((self._pending_queue[0], acc_arrivals, starts))
+        queue_deltas = np.concatenate((self._pending_queue[1],
+                                       np.ones(len(starts), np.int64),
+                                       -np.ones(len(starts), np.int64)))
+        finish_ticks = np.concatenate((self._pending_finish, finishes))
+
+        ready = queue_ticks < frontier
+        self._emit(self.queue_history, queue_ticks[ready], queue_deltas[ready])
+        self._pending_queue = (queue_ticks[~ready], queue_deltas[~ready])
+        ready = finish_ticks < frontier
+        self._emit(self.completed_history, finish_ticks[ready], np.ones(int(ready.sum()), np.int64))
+        self._pending_finish = finish_ticks[~ready]
+        rejected_ticks = arrivals[rejected]
+        self._emit(self.rejected_history, rejected_ticks, np.ones(len(rejected_ticks), np.int64))
+
+        block = np.column_stack((ids[accepted], acc_arrivals, acc_services, starts, finishes))
+        self.live = np.concatenate((self.live, block))
+        self.live = self.live[self.live[:, 4] >= frontier]
+
+        if self.done:
+            for history in (self.queue_history, self.completed_history, self.rejected_history):
+                history.extend_to(self.total_ticks)
+        return not self.done
+
+    def _recurse(self, arrivals: np.ndarray, services: np.ndarray):
+        # Последовательная часть: одна итерация на заявку по спискам Python
+        servers = self.servers
+        queued = self.queued_starts
+        capacity = self.queue_length
+        head = 0
+        tail = len(queued)
+        accepted = []
+        starts = []
+        finishes = []
+        replace = heapq.heapreplace
+        for i, arrival, service in zip(range(len(arrivals)), arrivals.tolist(), services.tolist()):
+            # Заявки, начавшие обслуживание к этому тику, очередь уже покинули
+            while head < tail and queued[head] <= arrival:
+                head += 1
+            if tail - head >= capacity:
+                continue  # Очередь полная → отказ
+            free = servers[0]
+            start = arrival + 1 if arrival + 1 > free else free
+            finish = start + service
+            replace(servers, finish)
+            queued.append(start)
+            tail += 1
+            starts.append(start)
+            finishes.append(finish)
+            accepted.append(i)
+        del queued[:head]
+        mask = np.zeros(len(arrivals), dtype=bool)
+        mask[accepted] = True
+        return mask, np.array(starts, dtype=np.int64), np.array(finishes, dtype=np.int64)
+
+    @staticmethod
+    def _emit(series: ChangePointSeries, ticks: np.ndarray, deltas: np.ndarray):
+        # Сумма изменений по каждому тику → значения на конец тика
+        if len(ticks) == 0:
+            return
+        unique, inverse = np.unique(ticks, return_inverse=True)
+        net = np.bincount(inverse, weights=deltas, minlength=len(unique)).astype(np.int64)
+        series.extend(unique, series.last + np.cumsum(net))
+
+    def in_system(self):
+        # Заявки, оставшиеся в системе на конец последнего тика: (в обслуживании, в очереди)
+        last_tick = self.total_ticks - 1
+        live = self.live[self.live[:, 0].argsort()]
+        return live[live[:, 3] <= last_tick], live[live[:, 3] > last_tick]
+
+
+def cross_check(params: dict, seed: int = 0, block_size: int = 1 << 16) -> dict:
+    # Блочный источник даёт одни и те же последовательности при поэлементной
+    # и блочной выдаче, поэтому быстрый путь и событийный движок с одним
+    # сидом должны пройти одну и ту же траекторию
+    from simulation import SMOSimulation, ENGINE_EVENT, ENGINE_VECTOR
+    from random_source import block_source
+
+    sim = SMOSimulation(**params, engine=ENGINE_VECTOR, block_size=block_size,
+                        source=block_source(params, seed))
+    sim.run()
+    reference = SMOSimulation(**params, engine=ENGINE_EVENT, source=block_source(params, seed))
+    reference.run()
+
+    fast, ref = sim.get_stats(), reference.get_stats()
+    report = {key: (fast[key], ref[key]) for key in
+              ("processed", "rejected", "in_queue", "in_processors")}
+    for key in ("queue_history", "completed_history", "rejected_history"):
+        report[key] = bool(np.array_equal(fast[key].ticks, ref[key].ticks)
+                           and np.array_equal(fast[key].values, ref[key].values))
+    report["wait_mean"] = (fast["wait_stats"].mean if fast["wait_stats"] else None,
+                           ref["wait_stats"].mean if ref["wait_stats"] else None)
+    report["ok"] = (all(a == b for a, b in (report[k] for k in
+                                             ("processed", "rejected", "in_queue", "in_processors")))
+                    and all(report[k] for k in ("queue_history", "completed_history", "rejected_history"))
+                    and (report["wait_mean"][0] is None or
+                         np.isclose(report["wait_mean"][0], report["wait_mean"][1])))
+    return report
@@ -0,0 +1,167 @@
+# Компактное хранение временных рядов СМО
+# Храним только тики, в которые значение меняется (change-point кодирование)
+
+import numpy as np
+
+
+class ChangePointSeries:
+    """
+    Ступенчатый временной ряд по тикам.
+    Значение на тике t — последнее изменение с тиком <= t.
+    Ряд покрывает тики [start, end): у продолжения из снимка он начинается
+    с тика снимка, и средние не захватывают время до него.
+    """
+
+    def __init__(self, initial: int = 0, capacity: int = 1024, start: int = 0):
+        self._ticks = np.empty(capacity, dtype=np.int64)   # Тики изменений
+        self._values = np.empty(capacity, dtype=np.int64)  # Значения с этого тика
+        self._ticks[0] = start
+        self._values[0] = initial
+        self._size = 1       # Количество точек изменения
+        self._start = start  # Первый тик ряда
+        self._length = start  # Конец ряда: тик после последнего (горизонт)
+        self._last = initial
+
+    def record(self, tick: int, value: int):
+        # Состояние на конце тика tick; повторы не сохраняются
+        if value != self._last:
+            size = self._size
+            if self._ticks[size - 1] == tick:
+                # Несколько изменений за один тик — остаётся последнее
+                if size > 1 and self._values[size - 2] == value:
+                    self._size -= 1
+                else:
+                    self._values[size - 1] = value
+            else:
+                if size == len(self._ticks):
+                    self._grow()
+                self._ticks[size] = tick
+                self._values[size] = value
+                self._size += 1
+            self._last = value
+        if tick >= self._length:
+            self._length = tick + 1
+
+    def extend(self, ticks: np.ndarray, values: np.ndarray):
+        # Пакетная запись: ticks строго возрастают и не меньше последнего тика
+        if len(ticks) == 0:
+            return
+        length = int(ticks[-1]) + 1
+        if ticks[0] == self._ticks[self._size - 1]:
+            # Первый тик пакета совпал с последней точкой — она перезаписывается
+            self._size -= 1
+        keep = np.ones(len(values), dtype=bool)
+        keep[1:] = values[1:] != values[:-1]
+        if self._size:
+            keep[0] = values[0] != self._values[self._size - 1]
+        ticks, values = ticks[keep], values[keep]
+        while self._size + len(ticks) > len(self._ticks):
+            self._grow()
+        self._ticks[self._size:self._size + len(ticks)] = ticks
+        self._values[self._size:self._size + len(ticks)] = values
+        self._size += len(ticks)
+        self._last = int(self._values[self._size - 1])
+        self._length = max(self._length, length)
+
+    def extend_to(self, length: int):
+        # Значение не менялось до тика length (не включая)
+        if length > self._length:
+            self._length = length
+
+    def _grow(self):
+        capacity = 2 * len(self._ticks)
+        self._ticks = np.resize(self._ticks, capacity)
+        self._values = np.resize(self._values, capacity)
+
+    @property
+    def ticks(self) -> np.ndarray:
+        return self._ticks[:self._size]
+
+    @property
+    def values(self) -> np.ndarray:
+        return self._values[:self._size]
+
+    @property
+    def last(self) -> int:
+        return self._last
+
+    @property
+    def start(self) -> int:
+        return self._start
+
+    @property
+    def end(self) -> int:
+        return self._length
+
+    @property
+    def nbytes(self) -> int:
+        return self._ticks.nbytes + self._values.nbytes
+
+    def __len__(self):
+        # Число тиков в ряду
+        return self._length - self._start
+
+    def __getitem__(self, tick: int) -> int:
+        # Значение на тике tick (отрицательный — от конца ряда)
+        if tick < 0:
+            tick += self._length
+        if not self._start <= tick < self._length:
+            raise IndexError("тик вне диапазона ряда")
+        pos = np.searchsorted(self.ticks, tick, side="right") - 1
+        return int(self._values[pos])
+
+    def __array__(self, dtype=None, copy=None):
+        dense = self.to_dense()
+        return dense if dtype is None else dense.astype(dtype)
+
+    def to_dense(self) -> np.ndarray:
+        # Полный ряд: по значению на каждый тик от start до end
+        if len(self) == 0:
+            return np.empty(0, dtype=np.int64)
+        ticks = self.ticks
+        ticks = ticks[ticks < self._length]
+        bounds = np.append(ticks[1:], self._length)
+        return np.repeat(self.values[:len(ticks)], bounds - ticks)
+
+    def resample(self, points: int):
+        # Значения в points равномерно расставленных тиках
+        if len(self) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        points = min(points, len(self))
+        sample_ticks = np.linspace(self._start, self._length - 1, points).astype(np.int64)
+        pos = np.searchsorted(self.ticks, sample_ticks, side="right") - 1
+        return sample_ticks, self.values[pos]
+
+    def mean(self) -> float:
+        # Среднее по времени (например, средняя длина очереди)
+        if len(self) == 0:
+            return float("nan")
+        ticks = self.ticks
+        keep = ticks < self._length
+        ticks, values = ticks[keep], self.values[keep]
+        durations = np.append(ticks[1:], self._length) - ticks
+        return float((values * durations).sum() / len(self))
+
+    def window_means(self, window: int) -> np.ndarray:
+        # Средние по времени в подряд идущих окнах по window тиков
+        # от start (неполное последнее окно отбрасывается)
+        count = len(self) // window
+        if count == 0:
+            return np.empty(0)
+        ticks, values = self.ticks, self.values
+        # Накопленная площадь под ступенчатой функцией на границах окон
+        area = np.concatenate(([0], np.cumsum(values[:-1] * np.diff(ticks))))
+        bounds = self._start + np.arange(count + 1, dtype=np.int64) * window
+        k = np.searchsorted(ticks, bounds, side="right") - 1
+        integral = area[k] + values[k] * (bounds - ticks[k])
+        return np.diff(integral) / window
+
+    def steps(self):
+        # Точки для ступенчатого графика (drawstyle="steps-post")
+        ticks = self.ticks
+        keep = ticks < self._length
+        ticks, values = ticks[keep], self.values[keep]
+        if len(self) > 0:
+            ticks = np.append(ticks, self._length - 1)
+            values = np.append(values, values[-1])
+        return ticks, values
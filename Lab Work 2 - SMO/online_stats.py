@@ -0,0 +1,219 @@
+# Потоковая статистика для времени ожидания и обслуживания
+# Память не зависит от числа обработанных заявок
+
+import math
+from collections import namedtuple
+import numpy as np
+
+
+# Те же поля, что у scipy.stats.describe — print_summary работает без изменений
+DescribeResult = namedtuple(
+    "DescribeResult", ("nobs", "minmax", "mean", "variance", "skewness", "kurtosis")
+)
+
+
+# Моменты до четвёртого (Welford / Pébay), минимум и максимум
+class OnlineMoments:
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0   # Суммы степеней отклонений от среднего
+        self.m3 = 0.0
+        self.m4 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add_block(self, values: np.ndarray):
+        # Моменты блока считаются векторно и сливаются с накопленными
+        if len(values) == 0:
+            return
+        block = OnlineMoments()
+        block.count = len(values)
+        block.mean = float(values.mean())
+        dev = values - block.mean
+        dev2 = dev * dev
+        block.m2 = float(dev2.sum())
+        block.m3 = float((dev2 * dev).sum())
+        block.m4 = float((dev2 * dev2).sum())
+        block.min = float(values.min())
+        block.max = float(values.max())
+        self.merge(block)
+
+    def merge(self, other: "OnlineMoments"):
+        # Объединение двух выборок (формулы Pébay)
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.__dict__.update(other.__dict__)
+            return
+        na, nb = self.count, other.count
+        n = na + nb
+        delta = other.mean - self.mean
+        delta_n = delta / n
+        m2 = self.m2 + other.m2 + delta * delta_n * na * nb
+        m3 = (self.m3 + other.m3
+              + delta * delta_n * delta_n * na * nb * (na - nb)
+              + 3 * delta_n * (na * other.m2 - nb * self.m2))
+        m4 = (self.m4 + other.m4
+              + delta * delta_n ** 3 * na * nb * (na * na - na * nb + nb * nb)
+              + 6 * delta_n * delta_n * (na * na * other.m2 + nb * nb * self.m2)
+              + 4 * delta_n * (na * other.m3 - nb * self.m3))
+        self.count = n
+        self.mean += delta_n * nb
+        self.m2, self.m3, self.m4 = m2, m3, m4
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def describe(self) -> DescribeResult:
+        # Соглашения scipy.stats.describe: несмещённая дисперсия,
+        # смещённые асимметрия и эксцесс (Фишер)
+        n = self.count
+        variance = self.m2 / (n - 1) if n > 1 else math.nan
+        if self.m2 > 0:
+            skewness = math.sqrt(n) * self.m3 / self.m2 ** 1.5
+            kurtosis = n * self.m4 / (self.m2 * self.m2) - 3.0
+        else:
+            skewness = kurtosis = math.nan
+        return DescribeResult(n, (self.min, self.max), self.mean, variance, skewness, kurtosis)
+
+
+# Потоковый квантиль — алгоритм P² (Jain, Chlamtac), пять маркеров
+class P2Quantile:
+    def __init__(self, p: float):
+        self.p = p
+        self.count = 0
+        self.heights = []                              # Высоты маркеров
+        self.positions = [0, 1, 2, 3, 4]               # Фактические позиции
+        self.desired = [0, 2 * p, 4 * p, 2 + 2 * p, 4]  # Желаемые позиции
+        self.increments = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def add(self, x: float):
+        self.count += 1
+        q = self.heights
+        if self.count <= 5:
+            q.append(x)
+            q.sort()
+            return
+
+        # Ячейка, в которую попало значение
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+
+        n = self.positions
+        for i in range(k + 1, 5):
+            n[i] += 1
+        desired = self.desired
+        for i in range(5):
+            desired[i] += self.increments[i]
+
+        # Подстройка трёх средних маркеров
+        for i in (1, 2, 3):
+            d = desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                qp = q[i] + d / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+                )
+                if not q[i - 1] < qp < q[i + 1]:
+                    # Параболическая оценка вышла за соседей — линейная
+                    qp = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                q[i] = qp
+                n[i] += d
+
+    def value(self) -> float:
+        if self.count == 0:
+            return math.nan
+        if self.count <= 5:
+            # Пока маркеров мало — точный квантиль по отсортированным значениям
+            return float(np.quantile(self.heights, self.p))
+        return self.heights[2]
+
+
+# Гистограмма с фиксированным числом корзин: при выходе за диапазон
+# соседние корзины сливаются попарно, а ширина удваивается
+class StreamingHistogram:
+    def __init__(self, bins: int = 64, width: float = 1.0):
+        if bins % 2:
+            raise ValueError("число корзин должно быть чётным")
+        self.bins = bins
+        self.width = width
+        self.counts = np.zeros(bins, dtype=np.int64)
+
+    def add_block(self, values: np.ndarray):
+        if len(values) == 0:
+            return
+        while values.max() >= self.bins * self.width:
+            pairs = self.counts.reshape(-1, 2).sum(axis=1)
+            self.counts = np.concatenate([pairs, np.zeros(self.bins // 2, dtype=np.int64)])
+            self.width *= 2
+        index = np.clip((values // self.width).astype(np.int64), 0, self.bins - 1)
+        self.counts += np.bincount(index, minlength=self.bins)
+
+    @property
+    def edges(self) -> np.ndarray:
+        return np.arange(self.bins + 1) * self.width
+
+    def trimmed(self):
+        # Корзины до последней непустой — для графика
+        used = np.flatnonzero(self.counts)
+        last = used[-1] + 1 if len(used) else 0
+        return self.counts[:last], self.edges[:last + 1]
+
+
+# Всё вместе: значения копятся в небольшом буфере и сливаются блоками
+class StreamingStats:
+    def __init__(self, quantiles=(0.5, 0.9, 0.99), bins: int = 64, block_size: int = 4096):
+        self.moments = OnlineMoments()
+        self.quantiles = {p: P2Quantile(p) for p in quantiles}
+        self.histogram = StreamingHistogram(bins)
+        self.block_size = block_size
+        self._buffer = []
+
+    def add(self, x):
+        self._buffer.append(x)
+        if len(self._buffer) >= self.block_size:
+            self.flush()
+
+    def add_block(self, values: np.ndarray):
+        # Сразу целый массив значений (буфер сначала сливается — порядок сохраняется)
+        self.flush()
+        values = np.asarray(values, dtype=np.float64)
+        for estimator in self.quantiles.values():
+            add = estimator.add
+            for x in values.tolist():
+                add(x)
+        self.moments.add_block(values)
+        self.histogram.add_block(values)
+
+    def flush(self):
+        if not self._buffer:
+            return
+        for estimator in self.quantiles.values():
+            add = estimator.add
+            for x in self._buffer:
+                add(x)
+        block = np.asarray(self._buffer, dtype=np.float64)
+        self.moments.add_block(block)
+        self.histogram.add_block(block)
+        self._buffer.clear()
+
+    @property
+    def count(self) -> int:
+        return self.moments.count + len(self._buffer)
+
+    def describe(self) -> DescribeResult:
+        self.flush()
+        return self.moments.describe()
+
+    def quantile_values(self) -> dict:
+        self.flush()
+        return {p: estimator.value() for p, estimator in self.quantiles.items()}
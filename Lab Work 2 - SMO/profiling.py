@@ -0,0 +1,81 @@
+# Профиль тика по фазам для движка tick
+# SMOSimulation(profile=PhaseProfile()) подменяет _step на версию с замерами:
+# время каждой фазы, число тиков, на которых она что-то сделала, счётчики событий
+# и выборка состояния раз в sample_every тиков. Фазы — те же методы, что вызывает
+# обычный _step; без профиля замеров нет
+
+import json
+import time
+
+
+# Фазы _step в порядке выполнения
+PHASES = ("finish", "dispatch", "wait_scan", "generate")
+
+
+class PhaseProfile:
+    def __init__(self, sample_every: int = 0, on_sample=None, clock=time.perf_counter):
+        # on_sample(sim, tick) — вызывается раз в sample_every тиков;
+        # без него в samples пишется (тик, очередь, занятые процессоры, обслужено, отказы)
+        self.sample_every = sample_every
+        self.on_sample = on_sample
+        self.clock = clock
+        self.times = dict.fromkeys(PHASES, 0.0)  # Секунды по фазам
+        self.calls = dict.fromkeys(PHASES, 0)    # Тиков, на которых фаза сделала работу
+        self.items = dict.fromkeys(PHASES, 0)    # Единиц работы по фазам (см. report)
+        self.ticks = 0
+        self.dispatches = 0
+        self.rejections = 0
+        self.busy_processor_ticks = 0
+        self.samples = []
+
+    def sample(self, sim, tick: int):
+        if self.on_sample is not None:
+            self.on_sample(sim, tick)
+            return
+        busy = sum(1 for p in sim.processors if p.is_busy())
+        self.samples.append((tick, len(sim.queue), busy, sim.completed_count, sim.rejected_count))
+
+    def report(self) -> dict:
+        # calls — тики, на которых фаза что-то сделала; время фазы идёт на каждом тике,
+        # поэтому цена — ns_per_tick.
+        # items: finish — завершённые заявки, dispatch — выданные из очереди,
+        # wait_scan — проставленные отметки начала ожидания, generate — пришедшие заявки
+        total = sum(self.times.values())
+        phases = {}
+        for phase in PHASES:
+            seconds = self.times[phase]
+            calls = self.calls[phase]
+            phases[phase] = {
+                "seconds": seconds,
+                "share": seconds / total if total else 0.0,
+                "calls": calls,
+                "items": self.items[phase],
+                "ns_per_tick": seconds / self.ticks * 1e9 if self.ticks else 0.0,
+            }
+        return {
+            "ticks": self.ticks,
+            "seconds": total,
+            "phases": phases,
+            "dispatches": self.dispatches,
+            "rejections": self.rejections,
+            "busy_processor_ticks": self.busy_processor_ticks,
+            "mean_busy": self.busy_processor_ticks / self.ticks if self.ticks else 0.0,
+            "samples": len(self.samples),
+        }
+
+    def write(self, path: str):
+        # Отчёт и выборки в JSON
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({**self.report(), "sample_rows": self.samples}, f, indent=2)
+
+    def print_report(self):
+        report = self.report()
+        print("=" * 60)
+        print(f"ПРОФИЛЬ ТИКА: {report['ticks']} тиков, {report['seconds']:.3f} с в фазах")
+        print("=" * 60)
+        for phase, row in report["phases"].items():
+            print(f"  {phase:10s} {row['seconds']:8.3f} с {row['share']:6.1%} "
+                  f"{row['ns_per_tick']:8.0f} нс/тик {row['calls']:10d} тиков с работой "
+                  f"{row['items']:10d} ед. работы")
+        print(f"  Выдано из очереди: {report['dispatches']}, отказов: {report['rejections']}, "
+              f"занято процессоров в среднем: {report['mean_busy']:.2f}")
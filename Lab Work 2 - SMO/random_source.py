@@ -0,0 +1,190 @@
+# Источники случайных величин для СМО
+# Источник выдаёт интервалы между заявками и времена обслуживания (в тиках)
+# по одному — для движков tick/event — и блоками — для быстрого пути
+
+import math
+import random
+import numpy as np
+
+
+# Распределения времени обслуживания: sample(generator, size) → int64 тиков
+
+class UniformService:
+    # Равномерное целое на [service_min, service_max] — как random.randint
+    def __init__(self, service_min: int, service_max: int):
+        self.service_min = service_min
+        self.service_max = service_max
+
+    def sample(self, generator: np.random.Generator, size: int) -> np.ndarray:
+        return generator.integers(self.service_min, self.service_max + 1, size, dtype=np.int64)
+
+
+class LogNormalService:
+    # Логнормальное с заданными средним (в тиках) и sigma логарифма
+    def __init__(self, mean: float, sigma: float):
+        self.mean = mean
+        self.sigma = sigma
+        self.mu = math.log(mean) - sigma * sigma / 2
+
+    def sample(self, generator: np.random.Generator, size: int) -> np.ndarray:
+        values = generator.lognormal(self.mu, self.sigma, size)
+        return np.rint(values).astype(np.int64)
+
+
+class EmpiricalService:
+    # Выборка с возвращением из наблюдённых времён обслуживания
+    def __init__(self, trace):
+        self.trace = np.asarray(trace, dtype=np.int64)
+        if len(self.trace) == 0:
+            raise ValueError("пустая выборка времён обслуживания")
+
+    def sample(self, generator: np.random.Generator, size: int) -> np.ndarray:
+        return self.trace[generator.integers(0, len(self.trace), size)]
+
+
+def exponential_gaps(generator: np.random.Generator, size: int,
+                     lambda_rate: float, ticks_per_second: int) -> np.ndarray:
+    # Интервалы в тиках с тем же округлением, что и round() в ExponentialGenerator
+    values = generator.exponential(1.0 / lambda_rate, size) * ticks_per_second
+    return np.rint(values).astype(np.int64)
+
+
+class LegacyRandomSource:
+    """
+    Поэлементные значения из random (или random.Random) — та же
+    последовательность, что и до появления источников: при одинаковом
+    random.seed результаты прежних прогонов воспроизводятся.
+    """
+
+    def __init__(self, lambda_rate: float, ticks_per_second: int,
+                 service_min: int, service_max: int, rng=random):
+        self.lambda_rate = lambda_rate
+        self.ticks_per_second = ticks_per_second
+        self.service_min = service_min
+        self.service_max = service_max
+        self.rng = rng
+        self._generator = None
+        self._unread = None
+
+    def next_interval(self) -> int:
+        interarrival = -math.log(1 - self.rng.random()) / self.lambda_rate
+        return round(interarrival * self.ticks_per_second)
+
+    def next_service(self) -> int:
+        return self.rng.randint(self.service_min, self.service_max)
+
+    def draw_block(self, size: int):
+        # Блоки — из генератора NumPy, засеянного из rng
+        if self._unread is not None:
+            gaps, services = self._unread
+            self._unread = None
+            return gaps, services
+        if self._generator is None:
+            self._generator = np.random.default_rng(self.rng.getrandbits(64))
+        gaps = exponential_gaps(self._generator, size, self.lambda_rate, self.ticks_per_second)
+        services = self._generator.integers(self.service_min, self.service_max + 1, size, dtype=np.int64)
+        return gaps, services
+
+    def unread(self, gaps: np.ndarray, services: np.ndarray):
+        # Неиспользованный хвост блока вернётся следующим draw_block
+        if len(gaps) and len(services):
+            self._unread = (gaps, services)
+
+
+class BlockRandomSource:
+    """
+    Значения тянутся из numpy.random.Generator большими блоками и выдаются
+    по одному. Интервалы и обслуживание идут из двух независимых потоков,
+    поэтому последовательности не зависят от размера блока и одинаковы
+    для поэлементной и блочной выдачи (event и vector дают одну траекторию).
+    """
+
+    def __init__(self, lambda_rate: float, ticks_per_second: int, service,
+                 seed=None, block_size: int = 1 << 14):
+        self.lambda_rate = lambda_rate
+        self.ticks_per_second = ticks_per_second
+        self.service = service
+        self.block_size = block_size
+        sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        gap_sequence, service_sequence = sequence.spawn(2)
+        self._gap_generator = np.random.default_rng(gap_sequence)
+        self._service_generator = np.random.default_rng(service_sequence)
+        self._gaps = iter(())
+        self._services = iter(())
+
+    def next_interval(self) -> int:
+        try:
+            return next(self._gaps)
+        except StopIteration:
+            self._gaps = iter(self._draw_gaps(self.block_size).tolist())
+            return next(self._gaps)
+
+    def next_service(self) -> int:
+        try:
+            return next(self._services)
+        except StopIteration:
+            self._services = iter(self._draw_services(self.block_size).tolist())
+            return next(self._services)
+
+    def draw_block(self, size: int):
+        # Сначала отдаём то, что осталось в буферах поэлементной выдачи
+        buffered = np.fromiter(self._gaps, dtype=np.int64)
+        self._gaps = iter(buffered[size:].tolist())
+        gaps = np.concatenate((buffered[:size], self._draw_gaps(max(size - len(buffered), 0))))
+        buffered = np.fromiter(self._services, dtype=np.int64)
+        self._services = iter(buffered[size:].tolist())
+        services = np.concatenate((buffered[:size], self._draw_services(max(size - len(buffered), 0))))
+        return gaps, services
+
+    def unread(self, gaps: np.ndarray, services: np.ndarray):
+        # Вернуть неиспользованный хвост блока: он будет выдан первым
+        self._gaps = iter(np.asarray(gaps).tolist() + list(self._gaps))
+        self._services = iter(np.asarray(services).tolist() + list(self._services))
+
+    def _draw_gaps(self, size: int) -> np.ndarray:
+        return exponential_gaps(self._gap_generator, size, self.lambda_rate, self.ticks_per_second)
+
+    def _draw_services(self, size: int) -> np.ndarray:
+        return self.service.sample(self._service_generator, size)
+
+
+class TraceSource:
+    # Повтор заранее записанных интервалов и времён обслуживания
+    def __init__(self, gaps, services):
+        self.gaps = np.asarray(gaps, dtype=np.int64)
+        self.services = np.asarray(services, dtype=np.int64)
+        self._gap_pos = 0
+        self._service_pos = 0
+
+    def next_interval(self) -> int:
+        value = int(self.gaps[self._gap_pos])
+        self._gap_pos += 1
+        return value
+
+    def next_service(self) -> int:
+        value = int(self.services[self._service_pos])
+        self._service_pos += 1
+        return value
+
+    def unread(self, gaps: np.ndarray, services: np.ndarray):
+        self._gap_pos -= len(gaps)
+        self._service_pos -= len(services)
+
+    def draw_block(self, size: int):
+        gaps = self.gaps[self._gap_pos:self._gap_pos + size]
+        services = self.services[self._service_pos:self._service_pos + size]
+        if len(gaps) == 0 or len(services) == 0:
+            raise ValueError("записанная последовательность исчерпана")
+        size = min(len(gaps), len(services))
+        self._gap_pos += size
+        self._service_pos += size
+        return gaps[:size], services[:size]
+
+
+def block_source(params: dict, seed=None, block_size: int = 1 << 14) -> BlockRandomSource:
+    # Блочный источник с равномерным обслуживанием для параметров SMOSimulation
+    return BlockRandomSource(
+        params["lambda_rate"], params.get("ticks_per_second", 100),
+        UniformService(params["service_min"], params["service_max"]),
+        seed=seed, block_size=block_size
+    )
@@ -0,0 +1,120 @@
+# Независимые прогоны СМО и доверительные интервалы
+# Каждый прогон получает свой блочный источник случайных чисел из одного мастер-сида,
+# поэтому результат не зависит от числа процессов
+
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+from simulation import SMOSimulation, ENGINE_EVENT, BASE_PARAMS, summarize
+from random_source import block_source
+
+
+# Показатели одного прогона (ключи simulation.summarize), по которым строятся интервалы;
+# None (нет ожиданий) становится NaN
+METRICS = ("processed", "rejected", "reject_share", "wait_mean", "wait_p90")
+
+
+def replication_seeds(master_seed: int, start: int, count: int):
+    # Потоки для прогонов start..start+count-1: дочерние SeedSequence
+    # мастер-сида с фиксированными номерами — не зависят от пакетов и процессов
+    return [np.random.SeedSequence(master_seed, spawn_key=(i,))
+            for i in range(start, start + count)]
+
+
+def run_replication(params: dict, seed: np.random.SeedSequence, snapshot: bytes = None) -> dict:
+    # Один прогон; храним только сводку, а не заявки.
+    # Со снимком прогон продолжает сохранённое состояние на params["total_ticks"] тиков
+    source = block_source(params, seed)
+    if snapshot is None:
+        sim = SMOSimulation(**params, engine=ENGINE_EVENT, keep_requests=False, source=source)
+    else:
+        sim = SMOSimulation.from_snapshot(snapshot, run_ticks=params["total_ticks"],
+                                          engine=ENGINE_EVENT, keep_requests=False, source=source)
+    sim.run()
+    summary = summarize(sim.get_stats())
+    return {metric: summary[metric] for metric in METRICS}
+
+
+def _run_task(task):
+    params, seed, snapshot = task
+    return run_replication(params, seed, snapshot)
+
+
+def confidence_interval(values, confidence: float = 0.95) -> dict:
+    # Интервал Стьюдента для среднего по прогонам
+    from scipy import stats
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    mean = float(values.mean())
+    if n < 2:
+        return {"mean": mean, "half_width": np.inf, "ci": (-np.inf, np.inf)}
+    sem = values.std(ddof=1) / np.sqrt(n)
+    half_width = float(stats.t.ppf((1 + confidence) / 2, n - 1) * sem)
+    return {"mean": mean, "half_width": half_width, "ci": (mean - half_width, mean + half_width)}
+
+
+def run_replications(
+    params: dict,
+    n_replications: int,
+    master_seed: int = 0,
+    workers: int = 1,
+    confidence: float = 0.95,
+    target_half_width: float = None,
+    target_metric: str = "wait_mean",
+    batch_size: int = 8,
+    snapshot: bytes = None
+) -> dict:
+    """
+    Прогоны идут пакетами по batch_size. Если задан target_half_width,
+    после каждого пакета проверяется полуширина интервала target_metric,
+    и при достижении цели прогоны прекращаются (но не больше n_replications).
+    snapshot — снимок установившегося режима (warmup.warmup_snapshot):
+    все прогоны стартуют из него, каждый со своим потоком случайных чисел.
+    """
+    if target_metric not in METRICS:
+        raise ValueError(f"Неизвестный показатель {target_metric!r}, ожидается один из {METRICS}")
+
+    results = []
+    pool = ProcessPoolExecutor(workers) if workers > 1 else None
+    try:
+        while len(results) < n_replications:
+            count = min(batch_size, n_replications - len(results))
+            seeds = replication_seeds(master_seed, len(results), count)
+            tasks = [(params, seed, snapshot) for seed in seeds]
+            batch = pool.map(_run_task, tasks) if pool else map(_run_task, tasks)
+            results.extend(batch)
+
+            if target_half_width is not None and len(results) >= 2:
+                values = [r[target_metric] for r in results]
+                if confidence_interval(values, confidence)["half_width"] <= target_half_width:
+                    break
+    finally:
+        if pool:
+            pool.shutdown()
+
+    summary = {"replications": len(results), "confidence": confidence}
+    for metric in METRICS:
+        values = np.array([r[metric] for r in results], dtype=np.float64)
+        summary[metric] = confidence_interval(values, confidence)
+        summary[metric]["values"] = values
+    return summary
+
+
+def print_replications(summary: dict):
+    print("=" * 60)
+    print(f"НЕЗАВИСИМЫЕ ПРОГОНЫ: {summary['replications']}, "
+          f"доверие {summary['confidence']:.0%}")
+    print("=" * 60)
+    for metric in METRICS:
+        m = summary[metric]
+        print(f"  {metric:13s} {m['mean']:12.3f} ± {m['half_width']:.3f}")
+
+
+def main():
+    summary = run_replications(BASE_PARAMS, n_replications=64, master_seed=42, workers=4,
+                               target_half_width=50.0)
+    print_replications(summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+# Трасса заявок в файле: по записи фиксированной ширины на каждую заявку,
+# покинувшую систему (обслуженную или отброшенную)
+# Запись идёт через отображение файла в память кусками по chunk_records записей,
+# поэтому память процесса не растёт с длиной прогона. Чтение — read_trace:
+# структурированный массив NumPy поверх того же файла, без копирования
+
+import os
+import struct
+import numpy as np
+
+
+# Запись: 5 целых по 8 байт + признак отказа, выравнивание до 48 байт.
+# У отброшенных заявок start и finish = -1; ожидание = start - arrival - 1
+TRACE_DTYPE = np.dtype({
+    "names": ["id", "arrival", "service", "start", "finish", "rejected"],
+    "formats": ["<i8", "<i8", "<i8", "<i8", "<i8", "u1"],
+    "offsets": [0, 8, 16, 24, 32, 40],
+    "itemsize": 48,
+})
+
+MAGIC = b"SMOTRACE"
+VERSION = 1
+# Заголовок: сигнатура, версия, размер записи, число записей; дополнен до 64 байт
+HEADER = struct.Struct("<8sIIQ")
+HEADER_SIZE = 64
+
+
+class TraceWriter:
+    def __init__(self, path: str, chunk_records: int = 1 << 20, buffer_records: int = 4096):
+        self.path = path
+        self.chunk_records = chunk_records
+        self.buffer_records = buffer_records
+        self.count = 0          # Записей в файле (без буфера)
+        self._buffer = []
+        self._chunk = None      # Текущее окно отображения
+        self._chunk_index = -1
+        self._file = open(path, "w+b")
+        self._write_header()
+
+    def add(self, req_id: int, arrival: int, service: int, start: int, finish: int, rejected: bool):
+        self._buffer.append((req_id, arrival, service, start, finish, rejected))
+        if len(self._buffer) >= self.buffer_records:
+            self._write(np.array(self._buffer, dtype=TRACE_DTYPE))
+            self._buffer.clear()
+
+    def add_block(self, ids, arrivals, services, starts, finishes, rejected):
+        # Сразу массив записей (быстрый путь); буфер сначала сливается — порядок сохраняется
+        self._drain()
+        block = np.empty(len(ids), dtype=TRACE_DTYPE)
+        block["id"] = ids
+        block["arrival"] = arrivals
+        block["service"] = services
+        block["start"] = starts
+        block["finish"] = finishes
+        block["rejected"] = rejected
+        self._write(block)
+
+    def _drain(self):
+        if self._buffer:
+            self._write(np.array(self._buffer, dtype=TRACE_DTYPE))
+            self._buffer.clear()
+
+    def _write(self, records: np.ndarray):
+        done = 0
+        while done < len(records):
+            index, pos = divmod(self.count, self.chunk_records)
+            if index != self._chunk_index:
+                self._map_chunk(index)
+            n = min(len(records) - done, self.chunk_records - pos)
+            self._chunk[pos:pos + n] = records[done:done + n]
+            done += n
+            self.count += n
+
+    def _map_chunk(self, index: int):
+        # Файл растёт на кусок, старое окно закрывается — в памяти одно окно
+        if self._chunk is not None:
+            self._chunk.flush()
+        chunk_bytes = self.chunk_records * TRACE_DTYPE.itemsize
+        self._file.truncate(HEADER_SIZE + (index + 1) * chunk_bytes)
+        self._chunk = np.memmap(self._file, dtype=TRACE_DTYPE, mode="r+",
+                                offset=HEADER_SIZE + index * chunk_bytes,
+                                shape=(self.chunk_records,))
+        self._chunk_index = index
+
+    def _write_header(self):
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, VERSION, TRACE_DTYPE.itemsize, self.count)
+                         .ljust(HEADER_SIZE, b"\0"))
+        self._file.flush()
+
+    def flush(self):
+        # После flush трассу можно читать, не дожидаясь конца прогона
+        self._drain()
+        if self._chunk is not None:
+            self._chunk.flush()
+        self._write_header()
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.flush()
+        self._chunk = None
+        # Хвост последнего куска не нужен
+        self._file.truncate(HEADER_SIZE + self.count * TRACE_DTYPE.itemsize)
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_trace(path: str) -> np.ndarray:
+    # Записи трассы как структурированный массив поверх файла (только чтение)
+    with open(path, "rb") as f:
+        magic, version, itemsize, count = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC or version != VERSION or itemsize != TRACE_DTYPE.itemsize:
+        raise ValueError(f"{path}: не трасса заявок СМО или другая версия формата")
+    if count == 0:
+        return np.empty(0, dtype=TRACE_DTYPE)
+    available = (os.path.getsize(path) - HEADER_SIZE) // TRACE_DTYPE.itemsize
+    return np.memmap(path, dtype=TRACE_DTYPE, mode="r", offset=HEADER_SIZE,
+                     shape=(min(count, available),))
+
+
+def wait_times(trace: np.ndarray) -> np.ndarray:
+    # Время ожидания обслуженных заявок (как в RequestStore.wait_times)
+    served = trace[trace["rejected"] == 0]
+    return served["start"] - served["arrival"] - 1
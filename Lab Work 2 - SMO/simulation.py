@@ -1,11 +1,17 @@
 
 import random
-import math
+import heapq
+import json
 from collections import deque
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Optional
 import numpy as np
 
+from history import ChangePointSeries
+from online_stats import StreamingStats
+from fastpath import FifoFastPath
+from random_source import LegacyRandomSource
+
 
 # Заявка
 @dataclass
@@ -18,12 +24,107 @@ class Request:
     finish_time: Optional[int] = None       # Когда завершена
 
 
+# Отметка «ещё не было» в столбцах хранилища
+NOT_SET = -1
+
+
+# Хранилище заявок: по столбцу на каждое поле Request
+class RequestStore:
+    COLUMNS = ("id", "arrival_time", "service_time",
+               "wait_start", "processing_start", "finish_time")
+
+    def __init__(self, capacity: int = 1024):
+        self.size = 0  # Сколько строк занято
+        for name in self.COLUMNS:
+            setattr(self, name, np.full(capacity, NOT_SET, dtype=np.int64))
+        self.rejected = np.zeros(capacity, dtype=bool)  # Не попала в очередь
+        self._free = []  # Освобождённые строки для повторного использования
+        self.recycled = False  # Были ли release — тогда прошлые заявки затёрты
+
+    def add(self, request_id: int, arrival_time: int, service_time: int) -> int:
+        # Новая заявка, возвращается её индекс в столбцах
+        if self._free:
+            index = self._free.pop()
+            self.wait_start[index] = NOT_SET
+            self.processing_start[index] = NOT_SET
+            self.finish_time[index] = NOT_SET
+            self.rejected[index] = False
+            self.id[index] = request_id
+            self.arrival_time[index] = arrival_time
+            self.service_time[index] = service_time
+            return index
+        index = self.size
+        if index == len(self.id):
+            self._grow()
+        self.id[index] = request_id
+        self.arrival_time[index] = arrival_time
+        self.service_time[index] = service_time
+        self.size += 1
+        return index
+
+    def _grow(self):
+        capacity = 2 * len(self.id)
+        for name in self.COLUMNS:
+            column = np.full(capacity, NOT_SET, dtype=np.int64)
+            column[:self.size] = getattr(self, name)[:self.size]
+            setattr(self, name, column)
+        rejected = np.zeros(capacity, dtype=bool)
+        rejected[:self.size] = self.rejected[:self.size]
+        self.rejected = rejected
+
+    def release(self, index: int):
+        # Строка больше не нужна — её займёт следующая заявка
+        self._free.append(index)
+        self.recycled = True
+
+    def __len__(self):
+        return self.size
+
+    def column(self, name: str) -> np.ndarray:
+        # Заполненная часть столбца (без копирования)
+        return getattr(self, name)[:self.size]
+
+    def get(self, index: int) -> Request:
+        # Заявка в виде объекта — для отладки
+        values = {name: int(getattr(self, name)[index]) for name in self.COLUMNS}
+        for name in ("wait_start", "processing_start", "finish_time"):
+            if values[name] == NOT_SET:
+                values[name] = None
+        return Request(**values)
+
+    def _check_complete(self):
+        if self.recycled:
+            raise RuntimeError("строки заявок переиспользовались (keep_requests=False) — "
+                               "выборка по всем заявкам недоступна")
+
+    def completed_indices(self) -> np.ndarray:
+        self._check_complete()
+        return np.flatnonzero(self.column("finish_time") != NOT_SET)
+
+    def rejected_indices(self) -> np.ndarray:
+        self._check_complete()
+        return np.flatnonzero(self.rejected[:self.size])
+
+    def wait_times(self) -> np.ndarray:
+        # Время ожидания обслуженных заявок (в порядке прихода)
+        done = self.completed_indices()
+        return self.processing_start[done] - self.wait_start[done]
+
+
 # Генератор заявок
 class ExponentialGenerator:
-    def __init__(self, lambda_rate: float, ticks_per_second: int):
+    def __init__(self, lambda_rate: float, ticks_per_second: int, source=None):
         self.lambda_rate = lambda_rate           # λ = 0.4 → средний интервал = 2.5 сек
         self.ticks_per_second = ticks_per_second # 1 сек = 100 тиков
         self.time_to_next = 0                    # Сколько тиков до следующей заявки
+        # Откуда берутся интервалы (см. random_source.py)
+        if source is None:
+            source = LegacyRandomSource(lambda_rate, ticks_per_second, 0, 0)
+        self.source = source
+
+    def next_interval(self) -> int:
+        # Экспоненциальный интервал до следующей заявки (в тиках)
+        return self.source.next_interval()
 
     def tick(self):
         # Каждый тик уменьшаем счётчик
@@ -32,8 +133,7 @@ class ExponentialGenerator:
             return None
         else:
             # Генерируем экспоненциальный интервал
-            interarrival = -math.log(1 - random.random()) / self.lambda_rate
-            self.time_to_next = round(interarrival * self.ticks_per_second)
+            self.time_to_next = self.next_interval()
             return self.time_to_next  # Возвращаем, что пора генерировать заявку
 
 
@@ -41,15 +141,15 @@ class ExponentialGenerator:
 class Queue:
     def __init__(self, max_length: int):
         self.max_length = max_length  # Максимум 30 заявок
-        self.requests = deque()       # FIFO: первый пришёл — первый обслужен
+        self.requests = deque()       # FIFO: индексы заявок в RequestStore
 
-    def add(self, request: Request) -> bool:
+    def add(self, request: int) -> bool:
         if len(self.requests) < self.max_length:
             self.requests.append(request)
             return True
         return False  # Очередь полная → заявка отброшена
 
-    def pop(self) -> Optional[Request]:
+    def pop(self) -> Optional[int]:
         return self.requests.popleft() if self.requests else None
 
     def __len__(self):
@@ -58,30 +158,65 @@ class Queue:
 
 # Процессор(3 паралельных канала)
 class Processor:
-    def __init__(self):
-        self.current_request: Optional[Request] = None
+    def __init__(self, store: RequestStore):
+        self.store = store
+        self.current_request: Optional[int] = None  # Индекс заявки в store
         self.remaining_time: int = 0  # Сколько тиков осталось
 
     def is_busy(self) -> bool:
         return self.current_request is not None
 
-    def start_processing(self, request: Request, current_tick: int):
+    def start_processing(self, request: int, current_tick: int):
         self.current_request = request
-        self.remaining_time = request.service_time
-        request.processing_start = current_tick  # Запоминаем начало
+        self.remaining_time = int(self.store.service_time[request])
+        self.store.processing_start[request] = current_tick  # Запоминаем начало
 
-    def tick(self, current_tick) -> Optional[Request]:
+    def tick(self, current_tick) -> Optional[int]:
         if not self.is_busy():
             return None
         self.remaining_time -= 1
         if self.remaining_time <= 0:
-            finished = self.current_request
-            finished.finish_time = current_tick
-            self.current_request = None
-            self.remaining_time = 0
-            return finished  # Заявка завершена
+            return self.finish(current_tick)  # Заявка завершена
         return None
 
+    def finish(self, current_tick) -> int:
+        finished = self.current_request
+        self.store.finish_time[finished] = current_tick
+        self.current_request = None
+        self.remaining_time = 0
+        return finished
+
+
+# Версия движков: увеличивать при любом изменении, влияющем на результаты
+# (по ней сбрасывается кэш параметрических прогонов)
+ENGINE_VERSION = 2
+
+# Движки моделирования
+ENGINE_TICK = "tick"    # Пошаговый: каждый тик обходит все компоненты
+ENGINE_EVENT = "event"  # Событийный: прыгает сразу к следующему событию
+ENGINE_VECTOR = "vector"  # Быстрый путь FIFO: блоки NumPy и рекурсия по каналам
+ENGINES = (ENGINE_TICK, ENGINE_EVENT, ENGINE_VECTOR)
+
+# Параметры модели по умолчанию — одни на все скрипты (run.py, cli.py, sweep.py, ...)
+BASE_PARAMS = dict(
+    total_ticks=1_000_000,   # ~2.78 часа
+    lambda_rate=0.4,         # Интенсивность потока
+    service_min=100,         # 1 секунда
+    service_max=1600,        # 16 секунд
+    queue_length=30,         # Конечная очередь
+    num_processors=3,        # Многоканальная СМО
+    ticks_per_second=100     # 1 сек = 100 тиков
+)
+
+# Квантили времени ожидания (P²); быстрый путь их не считает
+WAIT_QUANTILES = (0.5, 0.9, 0.99)
+
+# Типы событий. Порядок совпадает с фазами _step внутри одного тика:
+# сначала завершения, затем выдача из очереди, затем приход заявки
+EVENT_FINISH = 0
+EVENT_DISPATCH = 1
+EVENT_ARRIVAL = 2
+
 
 # Главный класс
 class SMOSimulation:
@@ -93,8 +228,20 @@ class SMOSimulation:
         service_max: int,
         queue_length: int,
         num_processors: int,
-        ticks_per_second: int = 100
+        ticks_per_second: int = 100,
+        engine: str = ENGINE_TICK,
+        keep_requests: bool = True,
+        rng: Optional[random.Random] = None,
+        block_size: int = 1 << 16,
+        source=None,
+        profile=None,
+        trace=None
     ):
+        if engine not in ENGINES:
+            raise ValueError(f"Неизвестный движок {engine!r}, ожидается один из {ENGINES}")
+        if profile is not None and engine != ENGINE_TICK:
+            raise ValueError("Профиль по фазам _step есть только у движка tick")
+
         # Параметры модели
         self.total_ticks = total_ticks
         self.lambda_rate = lambda_rate
@@ -103,93 +250,470 @@ class SMOSimulation:
         self.queue_length = queue_length
         self.num_processors = num_processors
         self.ticks_per_second = ticks_per_second
+        self.engine = engine
+        # False — строки завершённых заявок переиспользуются, память постоянна
+        self.keep_requests = keep_requests
+        # Собственный поток случайных чисел; по умолчанию — глобальный random
+        self.rng = rng if rng is not None else random
+        self.block_size = block_size  # Заявок в блоке быстрого пути
+        # Источник интервалов и времён обслуживания; по умолчанию — поэлементно из rng
+        if source is None:
+            source = LegacyRandomSource(lambda_rate, ticks_per_second,
+                                        service_min, service_max, self.rng)
+        self.source = source
+        # profiling.PhaseProfile — замеры по фазам тика (None — без замеров)
+        self.profile = profile
+        # request_trace.TraceWriter — запись каждой ушедшей из системы заявки в файл
+        # (закрывает тот, кто его создал)
+        self.trace = trace
 
         # Компоненты СМО
-        self.generator = ExponentialGenerator(lambda_rate, ticks_per_second)
+        # Ожидаемое число заявок — начальный размер столбцов хранилища
+        expected = int(total_ticks * lambda_rate / ticks_per_second) + 1
+        if not keep_requests:
+            expected = queue_length + num_processors + 1  # Живых заявок не больше
+        self.store = RequestStore(capacity=max(expected, 1024) if keep_requests else expected)
+        self.generator = ExponentialGenerator(lambda_rate, ticks_per_second, self.source)
         self.queue = Queue(queue_length)
-        self.processors = [Processor() for _ in range(num_processors)]  # 3 канала
-        self.rejected = []    # Не попали в очередь
-        self.completed = []   # Обслужены
+        self.processors = [Processor(self.store) for _ in range(num_processors)]  # 3 канала
+        self.completed_count = 0  # Обслужены
+        self.rejected_count = 0   # Не попали в очередь
 
         # Статистика (для графиков и анализа)
-        self.queue_history = []
-        self.completed_history = []
-        self.rejected_history = []
-        self.wait_times = []
-        self.service_times = []
+        # Ряды хранят только тики изменений, плотный вид — to_dense()
+        self.queue_history = ChangePointSeries()
+        self.completed_history = ChangePointSeries()
+        self.rejected_history = ChangePointSeries()
+        # Потоковые оценки: моменты, квантили P², гистограмма
+        # (быстрый путь пишет блоками, поэлементные квантили ему не подходят)
+        quantiles = () if engine == ENGINE_VECTOR else WAIT_QUANTILES
+        self.wait_stats = StreamingStats(quantiles=quantiles)
+        self.service_stats = StreamingStats(quantiles=quantiles)
 
         self.request_counter = 0
         self.current_tick = 0
+        self.ticks_done = 0  # Сколько тиков уже промоделировано
 
-    def run(self):
-        # Основной цикл имитации
-        for tick in range(self.total_ticks):
+    def run(self, until: Optional[int] = None):
+        # until — остановиться перед этим тиком; повторный run() продолжит
+        # с того же состояния (очередь, процессоры, отсчёт генератора)
+        until = self.total_ticks if until is None else min(until, self.total_ticks)
+        if until <= self.ticks_done:
+            return
+        if self.engine == ENGINE_EVENT:
+            self._run_events(until)
+        elif self.engine == ENGINE_VECTOR:
+            self._run_vector(until)
+        else:
+            self._run_ticks(until)
+        self.ticks_done = until
+        self._finalize_stats()
+
+    def _run_ticks(self, until: int):
+        # Основной цикл имитации; с профилем — другая функция шага,
+        # сам цикл и _step без профиля не меняются
+        step = self._step if self.profile is None else self._step_profiled
+        for tick in range(self.ticks_done, until):
             self.current_tick = tick
-            self._step()              # Один тик системы
+            step()                    # Один тик системы
             self._collect_stats()     # Сохраняем данные
 
-        self._finalize_stats()
+    def _run_events(self, until: int):
+        # Событийный цикл: та же траектория, что и у _run_ticks,
+        # но тики без событий пропускаются целиком.
+        # Куча событий: (тик, тип события, номер процессора),
+        # строится из состояния в «тиковом» виде — так работает продолжение
+        last_tick = self.ticks_done - 1
+        finish_ticks = [0] * self.num_processors
+        events = []
+        for index, processor in enumerate(self.processors):
+            if processor.is_busy():
+                finish_ticks[index] = last_tick + processor.remaining_time
+                events.append((finish_ticks[index], EVENT_FINISH, index))
+        next_arrival = last_tick + self.generator.time_to_next + 1
+        events.append((next_arrival, EVENT_ARRIVAL, -1))
+        if len(self.queue) > 0 and not all(p.is_busy() for p in self.processors):
+            events.append((last_tick + 1, EVENT_DISPATCH, -1))
+        heapq.heapify(events)
+
+        while events and events[0][0] < until:
+            tick = events[0][0]
+            self.current_tick = tick
+
+            # 1: Завершить обработку (по порядку процессоров, как в _step)
+            arrival = False
+            while events and events[0][0] == tick:
+                _, kind, index = heapq.heappop(events)
+                if kind == EVENT_FINISH:
+                    self._complete(self.processors[index].finish(tick))
+                elif kind == EVENT_ARRIVAL:
+                    arrival = True
+
+            # 2: Переместить из очереди в свободный процессор
+            store = self.store
+            for index, processor in enumerate(self.processors):
+                if not processor.is_busy() and len(self.queue) > 0:
+                    req = self.queue.pop()
+                    if store.wait_start[req] == NOT_SET:
+                        store.wait_start[req] = store.arrival_time[req] + 1  # Тик после прихода
+                    processor.start_processing(req, tick)
+                    finish_ticks[index] = tick + max(processor.remaining_time, 1)
+                    heapq.heappush(events, (finish_ticks[index], EVENT_FINISH, index))
+
+            # 3: Генерация новой заявки и планирование следующей
+            if arrival:
+                # Интервал тянется до времени обслуживания — как в generator.tick
+                next_arrival = tick + self.generator.next_interval() + 1
+                heapq.heappush(events, (next_arrival, EVENT_ARRIVAL, -1))
+                self._arrive()
+                # Свободный процессор заберёт заявку на следующем тике
+                if len(self.queue) > 0 and not all(p.is_busy() for p in self.processors):
+                    heapq.heappush(events, (tick + 1, EVENT_DISPATCH, -1))
+
+            self._collect_stats()
+
+        # Между событиями состояние не менялось — продлеваем ряды до горизонта
+        for history in (self.queue_history, self.completed_history, self.rejected_history):
+            history.extend_to(until)
+        last_tick = until - 1
+        self.current_tick = last_tick
+        # Состояние обратно в «тиковый» вид: остаток обслуживания и отсчёт генератора
+        for index, processor in enumerate(self.processors):
+            if processor.is_busy():
+                processor.remaining_time = finish_ticks[index] - last_tick
+        self.generator.time_to_next = next_arrival - last_tick - 1
+        # Заявкам в очереди _step проставил бы начало ожидания
+        store = self.store
+        for req in self.queue.requests:
+            if store.wait_start[req] == NOT_SET and store.arrival_time[req] < last_tick:
+                store.wait_start[req] = store.arrival_time[req] + 1
+
+    def _run_vector(self, until: int):
+        # Быстрый путь: блоки случайных величин и рекурсия по каналам
+        fast = FifoFastPath(until, self.num_processors, self.queue_length)
+        fast.request_counter = self.request_counter
+        fast.completed_count = self.completed_count
+        fast.rejected_count = self.rejected_count
+        fast.wait_stats = self.wait_stats
+        fast.service_stats = self.service_stats
+        fast.queue_history = self.queue_history
+        fast.completed_history = self.completed_history
+        fast.rejected_history = self.rejected_history
+        fast.trace = self.trace
+
+        store = self.store
+        if self.ticks_done > 0:
+            # Продолжение: заявки из системы передаются быстрому пути
+            last_tick = self.ticks_done - 1
+            busy = []
+            for processor in self.processors:
+                if processor.is_busy():
+                    index = processor.current_request
+                    busy.append((int(store.id[index]), int(store.arrival_time[index]),
+                                 int(store.service_time[index]), int(store.processing_start[index]),
+                                 last_tick + processor.remaining_time))
+                    store.release(index)
+                    processor.current_request = None
+                    processor.remaining_time = 0
+            queued = []
+            while len(self.queue) > 0:
+                index = self.queue.pop()
+                queued.append((int(store.id[index]), int(store.arrival_time[index]),
+                               int(store.service_time[index])))
+                store.release(index)
+            fast.resume(self.ticks_done, last_tick + self.generator.time_to_next + 1, busy, queued)
+
+        while fast.feed(*self.source.draw_block(self.block_size)):
+            pass
+        # Хвост последнего блока — обратно в источник, чтобы продолжение
+        # (run после run(until=...)) шло по той же последовательности
+        unread = getattr(self.source, "unread", None)
+        if unread is not None:
+            unread(*fast.leftover)
+
+        self.request_counter = fast.request_counter
+        self.completed_count = fast.completed_count
+        self.rejected_count = fast.rejected_count
+
+        # Оставшиеся в системе заявки — в хранилище, очередь и процессоры
+        last_tick = until - 1
+        self.current_tick = last_tick
+        in_service, queued = fast.in_system()
+        for processor, (req_id, arrival, service, start, finish) in zip(self.processors, in_service.tolist()):
+            index = store.add(req_id, arrival, service)
+            store.wait_start[index] = arrival + 1
+            processor.start_processing(index, start)
+            processor.remaining_time = finish - last_tick
+        for req_id, arrival, service, start, finish in queued.tolist():
+            index = store.add(req_id, arrival, service)
+            if arrival < last_tick:
+                store.wait_start[index] = arrival + 1
+            self.queue.add(index)
+        self.generator.time_to_next = fast.next_arrival - last_tick - 1
+
+    # Снимок состояния: очередь, процессоры, отсчёт генератора, счётчики.
+    # Источник случайных величин и накопленная статистика в снимок не входят —
+    # продолжения из одного снимка получают свои источники
+
+    def snapshot(self) -> bytes:
+        store = self.store
+
+        def row(index):
+            return [int(store.id[index]), int(store.arrival_time[index]),
+                    int(store.service_time[index]), int(store.wait_start[index]),
+                    int(store.processing_start[index])]
+
+        state = {
+            "engine_version": ENGINE_VERSION,
+            "params": {
+                "total_ticks": self.total_ticks,
+                "lambda_rate": self.lambda_rate,
+                "service_min": self.service_min,
+                "service_max": self.service_max,
+                "queue_length": self.queue_length,
+                "num_processors": self.num_processors,
+                "ticks_per_second": self.ticks_per_second,
+            },
+            "ticks_done": self.ticks_done,
+            "time_to_next": self.generator.time_to_next,
+            "queue": [row(index) for index in self.queue.requests],
+            "processors": [[row(p.current_request), p.remaining_time] if p.is_busy() else None
+                           for p in self.processors],
+            "request_counter": self.request_counter,
+            "completed_count": self.completed_count,
+            "rejected_count": self.rejected_count,
+        }
+        return json.dumps(state).encode("utf-8")
+
+    def save_snapshot(self, path: str):
+        with open(path, "wb") as f:
+            f.write(self.snapshot())
+
+    @classmethod
+    def from_snapshot(cls, data: bytes, run_ticks: Optional[int] = None,
+                      reset_stats: bool = True, **kwargs) -> "SMOSimulation":
+        # run_ticks — сколько тиков моделировать после снимка (по умолчанию до
+        # исходного горизонта); reset_stats — считать обслуженные/отказы заново.
+        # kwargs — engine, source, rng и прочие параметры, не входящие в снимок
+        state = json.loads(data)
+        if state.get("engine_version") != ENGINE_VERSION:
+            # Другая версия движка — другая траектория; как и кэш sweep, такой снимок не годится
+            raise ValueError(f"снимок сделан движком версии {state.get('engine_version')}, "
+                             f"текущая — {ENGINE_VERSION}")
+        params = dict(state["params"])
+        ticks_done = state["ticks_done"]
+        if run_ticks is not None:
+            params["total_ticks"] = ticks_done + run_ticks
+        sim = cls(**params, **kwargs)
+
+        store = sim.store
+
+        def add(row):
+            req_id, arrival, service, wait_start, processing_start = row
+            index = store.add(req_id, arrival, service)
+            store.wait_start[index] = wait_start
+            store.processing_start[index] = processing_start
+            return index
+
+        for row in state["queue"]:
+            sim.queue.add(add(row))
+        for processor, busy in zip(sim.processors, state["processors"]):
+            if busy is not None:
+                processor.current_request = add(busy[0])
+                processor.remaining_time = busy[1]
+
+        sim.ticks_done = ticks_done
+        sim.current_tick = ticks_done - 1
+        sim.generator.time_to_next = state["time_to_next"]
+        sim.request_counter = state["request_counter"]
+        if not reset_stats:
+            sim.completed_count = state["completed_count"]
+            sim.rejected_count = state["rejected_count"]
+        # Ряды начинаются с тика снимка и состояния в этот момент
+        sim.queue_history = ChangePointSeries(initial=len(sim.queue), start=ticks_done)
+        sim.completed_history = ChangePointSeries(initial=sim.completed_count, start=ticks_done)
+        sim.rejected_history = ChangePointSeries(initial=sim.rejected_count, start=ticks_done)
+        return sim
+
+    @classmethod
+    def load_snapshot(cls, path: str, **kwargs) -> "SMOSimulation":
+        with open(path, "rb") as f:
+            return cls.from_snapshot(f.read(), **kwargs)
+
+    def _complete(self, finished: int):
+        self.completed_count += 1
+        # Время ожидания = начало обработки - начало ожидания
+        store = self.store
+        wait = int(store.processing_start[finished] - store.wait_start[finished])
+        self.wait_stats.add(wait)
+        self.service_stats.add(int(store.service_time[finished]))
+        if self.trace is not None:
+            self.trace.add(int(store.id[finished]), int(store.arrival_time[finished]),
+                           int(store.service_time[finished]), int(store.processing_start[finished]),
+                           int(store.finish_time[finished]), False)
+        if not self.keep_requests:
+            store.release(finished)
+
+    def _arrive(self):
+        self.request_counter += 1
+        service_time = self.source.next_service()
+        new_req = self.store.add(self.request_counter, self.current_tick, service_time)
+        if not self.queue.add(new_req):
+            self.store.rejected[new_req] = True  # Очередь полная
+            self.rejected_count += 1
+            if self.trace is not None:
+                self.trace.add(self.request_counter, self.current_tick, service_time, NOT_SET, NOT_SET, True)
+            if not self.keep_requests:
+                self.store.release(new_req)
 
     def _step(self):
-        # 1: Завершить обработку
+        tick = self.current_tick
+        self._finish_phase(tick)      # 1: Завершить обработку
+        self._dispatch_phase(tick)    # 2: Переместить из очереди в свободный процессор
+        self._wait_scan_phase(tick)   # 3: Отметить начало ожидания в очереди
+        self._generate_phase()        # 4: Генерация новой заявки
+
+    # Фазы тика — общие для _step и _step_profiled; каждая возвращает объём работы
+
+    def _finish_phase(self, tick: int) -> int:
+        completed = 0
         for processor in self.processors:
-            finished = processor.tick(self.current_tick)
-            if finished:
-                self.completed.append(finished)
-                # Время ожидания = начало обработки - начало ожидания
-                wait = (finished.processing_start - finished.wait_start)
-                self.wait_times.append(wait)
-                self.service_times.append(finished.service_time)
-
-        # 2: Переместить из очереди в свободный процессор
+            finished = processor.tick(tick)
+            if finished is not None:
+                self._complete(finished)
+                completed += 1
+        return completed
+
+    def _dispatch_phase(self, tick: int) -> int:
+        wait_start = self.store.wait_start
+        dispatched = 0
         for processor in self.processors:
             if not processor.is_busy() and len(self.queue) > 0:
                 req = self.queue.pop()
-                if req.wait_start is None:
-                    req.wait_start = self.current_tick  # Начало ожидания
-                processor.start_processing(req, self.current_tick)
+                if wait_start[req] == NOT_SET:
+                    wait_start[req] = tick  # Начало ожидания
+                processor.start_processing(req, tick)
+                dispatched += 1
+        return dispatched
 
-        # 3: Увеличить время ожидания в очереди
-        for req in self.queue.requests:
-            if req.wait_start is None:
-                req.wait_start = self.current_tick
-
-        # 4: Генерация новой заявки
-        next_in = self.generator.tick()
-        if next_in is not None:
-            self.request_counter += 1
-            service_time = random.randint(self.service_min, self.service_max)
-            new_req = Request(
-                id=self.request_counter,
-                arrival_time=self.current_tick,
-                service_time=service_time
-            )
-            if not self.queue.add(new_req):
-                self.rejected.append(new_req)  # Очередь полная
+    def _wait_scan_phase(self, tick: int) -> int:
+        # Отметку ставим с хвоста: у всех более ранних заявок она уже есть
+        wait_start = self.store.wait_start
+        marked = 0
+        for req in reversed(self.queue.requests):
+            if wait_start[req] != NOT_SET:
+                break
+            wait_start[req] = tick
+            marked += 1
+        return marked
+
+    def _generate_phase(self) -> int:
+        if self.generator.tick() is None:
+            return 0
+        self._arrive()
+        return 1
+
+    def _step_profiled(self):
+        # Те же фазы, что в _step, но с замером времени и счётчиками событий.
+        # calls — тики, на которых фаза что-то сделала (items > 0)
+        profile = self.profile
+        clock = profile.clock
+        times = profile.times
+        calls = profile.calls
+        items = profile.items
+        tick = self.current_tick
+        rejected = self.rejected_count
+
+        t0 = clock()
+        work = {"finish": self._finish_phase(tick)}
+        t1 = clock()
+        work["dispatch"] = self._dispatch_phase(tick)
+        t2 = clock()
+        work["wait_scan"] = self._wait_scan_phase(tick)
+        t3 = clock()
+        work["generate"] = self._generate_phase()
+        t4 = clock()
+
+        times["finish"] += t1 - t0
+        times["dispatch"] += t2 - t1
+        times["wait_scan"] += t3 - t2
+        times["generate"] += t4 - t3
+        for phase, done in work.items():
+            if done:
+                calls[phase] += 1
+                items[phase] += done
+        profile.ticks += 1
+        profile.dispatches += work["dispatch"]
+        profile.rejections += self.rejected_count - rejected
+        # Занятые процессоры на конце тика (генерация занятость не меняет)
+        profile.busy_processor_ticks += sum(1 for p in self.processors if p.is_busy())
+        if profile.sample_every and tick % profile.sample_every == 0:
+            profile.sample(self, tick)
 
     def _collect_stats(self):
-        # Сохраняем состояние каждый тик — для графиков
-        self.queue_history.append(len(self.queue))
-        self.completed_history.append(len(self.completed))
-        self.rejected_history.append(len(self.rejected))
+        # Сохраняем состояние тика — для графиков (повторы не хранятся)
+        tick = self.current_tick
+        self.queue_history.record(tick, len(self.queue))
+        self.completed_history.record(tick, self.completed_count)
+        self.rejected_history.record(tick, self.rejected_count)
 
     def _finalize_stats(self):
-        pass  # Всё уже собрано
+        # Сливаем остатки буферов потоковой статистики
+        self.wait_stats.flush()
+        self.service_stats.flush()
+
+    @property
+    def _requests_kept(self) -> bool:
+        # Все заявки есть в store, только если они сохраняются; быстрый путь
+        # хранит в store лишь заявки, оставшиеся в системе
+        return self.keep_requests and self.engine != ENGINE_VECTOR
+
+    @property
+    def completed(self) -> Optional[np.ndarray]:
+        # Индексы обслуженных заявок в store; None, если заявки не сохраняются
+        return self.store.completed_indices() if self._requests_kept else None
+
+    @property
+    def rejected(self) -> Optional[np.ndarray]:
+        # Индексы отброшенных заявок в store; None, если заявки не сохраняются
+        return self.store.rejected_indices() if self._requests_kept else None
 
     def get_stats(self):
-        # Анализ
-        from scipy import stats
-        wait_arr = np.array(self.wait_times)
-        service_arr = np.array(self.service_times)
+        # Анализ: describe в формате scipy.stats.describe, но без хранения выборки
+        wait_counts, wait_edges = self.wait_stats.histogram.trimmed()
         return {
-            "processed": len(self.completed),
-            "rejected": len(self.rejected),
+            "processed": self.completed_count,
+            "rejected": self.rejected_count,
             "in_queue": len(self.queue),
             "in_processors": sum(1 for p in self.processors if p.is_busy()),
-            "wait_stats": stats.describe(wait_arr) if len(wait_arr) > 0 else None,
-            "service_stats": stats.describe(service_arr) if len(service_arr) > 0 else None,
+            "wait_stats": self.wait_stats.describe() if self.wait_stats.count > 0 else None,
+            "service_stats": self.service_stats.describe() if self.service_stats.count > 0 else None,
+            "wait_quantiles": self.wait_stats.quantile_values(),
+            "wait_histogram": (wait_counts, wait_edges),
             "queue_history": self.queue_history,
             "completed_history": self.completed_history,
             "rejected_history": self.rejected_history,
-            "wait_times": self.wait_times
-        }
\ No newline at end of file
+            # Полная выборка есть, только если заявки сохраняются
+            "wait_times": self.store.wait_times() if self._requests_kept else None
+        }
+
+def summarize(stats: dict) -> dict:
+    """
+    Скалярная сводка прогона по get_stats() — общая для прогонов,
+    перебора, замеров и командной строки. Чего прогон не дал (ожиданий
+    нет, квантили у быстрого пути не считаются) — None.
+    """
+    arrived = stats["processed"] + stats["rejected"]
+    wait = stats["wait_stats"]
+    summary = {
+        "processed": stats["processed"],
+        "rejected": stats["rejected"],
+        "reject_share": stats["rejected"] / arrived if arrived else 0.0,
+        "queue_mean": float(stats["queue_history"].mean()),
+        "wait_mean": float(wait.mean) if wait else None,
+        "wait_std": float(np.sqrt(wait.variance)) if wait and wait.nobs > 1 else None,
+    }
+    for p in WAIT_QUANTILES:
+        value = stats["wait_quantiles"].get(p)
+        summary[f"wait_p{round(p * 100)}"] = None if value is None else float(value)
+    return summary
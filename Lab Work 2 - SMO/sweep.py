@@ -0,0 +1,129 @@
+# Параметрический перебор конфигураций СМО с кэшем результатов на диске
+# Точка сетки считается один раз: сводка лежит в файле, ключ — хеш
+# параметров, сида и версии движка
+
+import csv
+import hashlib
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from simulation import SMOSimulation, ENGINE_EVENT, ENGINE_VERSION, BASE_PARAMS, summarize
+from random_source import block_source
+
+
+DEFAULT_CACHE_DIR = ".smo_cache"
+
+
+def grid_points(grid: dict, base: dict = None):
+    # Декартово произведение значений сетки поверх базовых параметров.
+    # Ключ "service_range" задаёт пару (service_min, service_max)
+    base = dict(BASE_PARAMS if base is None else base)
+    names = list(grid)
+    for combo in itertools.product(*(grid[name] for name in names)):
+        params = dict(base)
+        for name, value in zip(names, combo):
+            if name == "service_range":
+                params["service_min"], params["service_max"] = value
+            else:
+                params[name] = value
+        yield params
+
+
+def point_key(params: dict, seed: int) -> str:
+    payload = json.dumps(
+        {"params": params, "seed": seed, "engine_version": ENGINE_VERSION},
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def run_point(params: dict, seed: int) -> dict:
+    # Один прогон точки сетки; одинаковый сид во всех точках —
+    # общие случайные числа, сравнение конфигураций точнее
+    sim = SMOSimulation(**params, engine=ENGINE_EVENT, keep_requests=False,
+                        source=block_source(params, seed))
+    sim.run()
+    return summarize(sim.get_stats())
+
+
+def _run_task(task):
+    params, seed = task
+    return run_point(params, seed)
+
+
+def _load(path: str):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None  # Нет файла или он битый — пересчитаем
+
+
+def _store(path: str, record: dict):
+    # Запись через временный файл, чтобы прерванный перебор не оставил обрывков
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(record, f)
+    os.replace(tmp, path)
+
+
+def sweep(
+    grid: dict,
+    base: dict = None,
+    seed: int = 0,
+    workers: int = 1,
+    cache_dir: str = DEFAULT_CACHE_DIR
+) -> list:
+    """
+    Возвращает таблицу: по строке на точку сетки, в строке параметры и сводка.
+    Считаются только точки, которых ещё нет в кэше.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    points = list(grid_points(grid, base))
+    paths = [os.path.join(cache_dir, point_key(p, seed) + ".json") for p in points]
+
+    records = [_load(path) for path in paths]
+    missing = [i for i, record in enumerate(records) if record is None]
+    if missing:
+        tasks = [(points[i], seed) for i in missing]
+        if workers > 1:
+            with ProcessPoolExecutor(workers) as pool:
+                summaries = list(pool.map(_run_task, tasks))
+        else:
+            summaries = [_run_task(task) for task in tasks]
+        for i, summary in zip(missing, summaries):
+            records[i] = {"params": points[i], "seed": seed,
+                          "engine_version": ENGINE_VERSION, "summary": summary}
+            _store(paths[i], records[i])
+
+    return [{**record["params"], "seed": record["seed"], **record["summary"]}
+            for record in records]
+
+
+def write_table(rows: list, path: str):
+    # Одна «длинная» таблица: строка — точка, столбец — параметр или показатель
+    if not rows:
+        return
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main():
+    grid = {
+        "lambda_rate": [0.2, 0.3, 0.4, 0.5],
+        "num_processors": [2, 3, 4],
+        "queue_length": [10, 30],
+    }
+    rows = sweep(grid, seed=42, workers=4)
+    write_table(rows, "sweep.csv")
+    for row in rows:
+        print(f"λ={row['lambda_rate']:.2f} c={row['num_processors']} K={row['queue_length']:3d}  "
+              f"отказы {row['reject_share']:.3f}  очередь {row['queue_mean']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# Выбор следующего состояния за O(1) — таблицы псевдонимов Уолкера (построение Воуза)
+# Для каждой строки матрицы переходов строится таблица один раз; шаг траектории —
+# одно случайное число и одно сравнение, независимо от числа состояний.
+# SparseAliasSampler хранит только ненулевые переходы — для больших цепей,
+# где у состояния всего несколько преемников
+
+import random
+import numpy as np
+
+
+def vose_table(probs):
+    """
+    Таблица псевдонимов для одного распределения: (prob, alias).
+    Выбор: u = random() * n, k = int(u); k, если u - k < prob[k], иначе alias[k].
+    """
+    n = len(probs)
+    total = float(sum(probs))
+    scaled = [p * n / total for p in probs]
+    prob = [1.0] * n
+    alias = list(range(n))
+    small = [i for i, p in enumerate(scaled) if p < 1.0]
+    large = [i for i, p in enumerate(scaled) if p >= 1.0]
+    while small and large:
+        s = small.pop()
+        l = large.pop()
+        prob[s] = scaled[s]
+        alias[s] = l
+        scaled[l] = scaled[l] + scaled[s] - 1.0
+        (small if scaled[l] < 1.0 else large).append(l)
+    # Оставшиеся (в том числе из-за округления) — вероятность 1
+    return prob, alias
+
+
+class AliasSampler:
+    # Плотная матрица: по таблице n элементов на строку
+    def __init__(self, matrix, rng=random):
+        self.rng = rng
+        self.n_states = len(matrix)
+        tables = [vose_table(list(row)) for row in matrix]
+        # Списки Python — поэлементный доступ из sample быстрее, чем к массиву NumPy
+        self.prob = [t[0] for t in tables]
+        self.alias = [t[1] for t in tables]
+        self._prob_array = None
+        self._alias_array = None
+
+    def sample(self, state: int) -> int:
+        u = self.rng.random() * self.n_states
+        k = int(u)
+        return k if u - k < self.prob[state][k] else self.alias[state][k]
+
+    def sample_many(self, states: np.ndarray, u: np.ndarray) -> np.ndarray:
+        # То же для массива состояний (u — равномерные на [0, 1))
+        if self._prob_array is None:
+            self._prob_array = np.array(self.prob)
+            self._alias_array = np.array(self.alias)
+        u = u * self.n_states
+        k = u.astype(np.intp)
+        keep = (u - k) < self._prob_array[states, k]
+        return np.where(keep, k, self._alias_array[states, k])
+
+
+class SparseAliasSampler:
+    """
+    Только ненулевые переходы: таблица строки i имеет размер d_i (число
+    преемников), памяти O(ненулевых). matrix — список строк, массив NumPy
+    или разреженная матрица scipy (берётся CSR-представление).
+    """
+
+    def __init__(self, matrix, rng=random):
+        self.rng = rng
+        if hasattr(matrix, "tocsr"):
+            csr = matrix.tocsr()
+            csr.eliminate_zeros()
+            indptr, indices, data = csr.indptr, csr.indices, csr.data
+        else:
+            dense = np.asarray(matrix, dtype=np.float64)
+            rows, cols = np.nonzero(dense)
+            indptr = np.concatenate(([0], np.cumsum(np.bincount(rows, minlength=len(dense)))))
+            indices, data = cols, dense[rows, cols]
+        self.n_states = len(indptr) - 1
+
+        self.successors = []  # Номера преемников строки
+        self.prob = []
+        self.alias = []       # Индексы внутри строки преемников
+        for i in range(self.n_states):
+            start, end = indptr[i], indptr[i + 1]
+            if start == end:
+                raise ValueError(f"строка {i} матрицы переходов пуста")
+            prob, alias = vose_table(data[start:end].tolist())
+            self.successors.append(indices[start:end].tolist())
+            self.prob.append(prob)
+            self.alias.append(alias)
+
+    def sample(self, state: int) -> int:
+        successors = self.successors[state]
+        u = self.rng.random() * len(successors)
+        k = int(u)
+        if u - k >= self.prob[state][k]:
+            k = self.alias[state][k]
+        return successors[k]
@@ -1,13 +1,14 @@
 import random
-import matplotlib.pyplot as plt
+from collections import namedtuple
 import numpy as np
-from scipy import stats
 
 # параметры
 N_STATES = 30           # Количество состояний
 ABSORBING_STATE = 29    # Поглощающее состояние
 N_TRAJECTORIES = 1000   # Количество траекторий
 MAX_STEPS = 200         # Макс. шагов на траекторию
+ENGINE = "loop"         # "batch" — все траектории разом (markov_batch.py), для 10^6+ траекторий
+SAMPLER = "cdf"         # "alias" — шаг через таблицы псевдонимов (для режима "loop")
 
 # Генерация распределения вероятностей
 def generate_distribution(n):
@@ -39,8 +40,9 @@ def next_state(prob_vector):
     return len(prob_vector) - 1
 
 # Одна траектория с временем до поглощения
-def simulate_trajectory(matrix, absorbing, max_steps):
-    state = random.randint(0, N_STATES - 1)
+# sampler — таблицы псевдонимов (alias_sampler.py): шаг за O(1) вместо прохода по строке
+def simulate_trajectory(matrix, absorbing, max_steps, sampler=None):
+    state = random.randint(0, len(matrix) - 1)
     if state == absorbing:
         return [state], 0  # Уже в поглощающем
 
@@ -48,7 +50,7 @@ def simulate_trajectory(matrix, absorbing, max_steps):
     steps = 0
 
     while state != absorbing and steps < max_steps:
-        state = next_state(matrix[state])
+        state = sampler.sample(state) if sampler is not None else next_state(matrix[state])
         trajectory.append(state)
         steps += 1
         if state == absorbing:
@@ -56,90 +58,135 @@ def simulate_trajectory(matrix, absorbing, max_steps):
 
     return trajectory, max_steps  # Не попал за max_steps
 
-# Основная симуляция
-random.seed(42)
-transition_matrix = generate_transition_matrix(N_STATES, ABSORBING_STATE)
-
-absorption_times = []
-all_final_states = []
-
-print("Запуск 1000 траекторий...")
-for _ in range(N_TRAJECTORIES):
-    traj, time_to_absorb = simulate_trajectory(transition_matrix, ABSORBING_STATE, MAX_STEPS)
-    absorption_times.append(time_to_absorb)
-    all_final_states.append(traj[-1])
-
-# Вывод статистики
-absorption_times = np.array(absorption_times)
-final_counts = np.bincount(all_final_states, minlength=N_STATES)
-
-print("\n" + "="*60)
-print("РЕЗУЛЬТАТЫ МОДЕЛИРОВАНИЯ ЦЕПИ МАРКОВА")
-print("="*60)
-print(f"Поглощающее состояние: {ABSORBING_STATE}")
-print(f"Траекторий: {N_TRAJECTORIES}")
-print(f"Попало в поглощающее: {np.sum(np.array(all_final_states) == ABSORBING_STATE)}")
-print(f"Среднее время до поглощения: {absorption_times.mean():.2f} шагов")
-print(f"Медиана: {np.median(absorption_times):.2f}")
-print(f"Мин: {absorption_times.min()}, Макс: {absorption_times.max()}")
-print(f"Не попало за {MAX_STEPS} шагов: {np.sum(absorption_times == MAX_STEPS)}")
-
-
-
-
-
-
-
-
-
-# Графики
-
-
-fig = plt.figure(figsize=(15, 10))
-
-# 1. Пример траектории
-ax1 = fig.add_subplot(2, 2, 1)
-sample_traj, _ = simulate_trajectory(transition_matrix, ABSORBING_STATE, MAX_STEPS)
-ax1.plot(sample_traj, 'b-o', markersize=3, linewidth=1)
-ax1.axhline(y=ABSORBING_STATE, color='r', linestyle='--', label=f'Поглощающее ({ABSORBING_STATE})')
-ax1.set_title("Пример траектории")
-ax1.set_xlabel("Шаг")
-ax1.set_ylabel("Состояние")
-ax1.legend()
-
-# 2. Частоты финальных состояний
-ax2 = fig.add_subplot(2, 2, 2)
-ax2.bar(range(N_STATES), final_counts, color='skyblue', edgecolor='black')
-ax2.bar(ABSORBING_STATE, final_counts[ABSORBING_STATE], color='red')
-ax2.set_title("Частоты финальных состояний")
-ax2.set_xlabel("Состояние")
-ax2.set_ylabel("Количество траекторий")
-
-# 3. Гистограмма времени до поглощения
-ax3 = fig.add_subplot(2, 2, 3)
-successful_times = absorption_times[absorption_times < MAX_STEPS]
-ax3.hist(successful_times, bins=30, color='lightgreen', edgecolor='black')
-ax3.set_title("Гистограмма времени до поглощения")
-ax3.set_xlabel("Шаги")
-ax3.set_ylabel("Частота")
-
-# 4. График переходов (матрица)
-ax4 = fig.add_subplot(2, 2, 4)
-im = ax4.imshow(transition_matrix, cmap='Blues', aspect='auto')
-ax4.set_title("Матрица переходных вероятностей")
-ax4.set_xlabel("След. состояние")
-ax4.set_ylabel("Тек. состояние")
-plt.colorbar(im, ax=ax4, label="Вероятность")
-
-plt.tight_layout()
-plt.show()
-
-# === scipy.stats.describe ===
-if len(successful_times) > 0:
-    desc = stats.describe(successful_times)
-    print("\nСТАТИСТИКА (scipy.stats.describe):")
-    print(f"  N: {desc.nobs}")
-    print(f"  Среднее: {desc.mean:.2f}")
-    print(f"  Дисперсия: {desc.variance:.2f}")
-    print(f"  Асимметрия: {desc.skewness:.2f}")
-    print(f"  Эксцесс: {desc.kurtosis:.2f}")
\ No newline at end of file
+# Итог траектории без пути: старт, финальное состояние, шаги, посещения {состояние: число}
+# path — путь (uint16) только у траекторий из запрошенной выборки, у остальных None
+TrajectorySummary = namedtuple("TrajectorySummary", "start final steps visits path")
+
+def iter_summaries(matrix, absorbing, n_trajectories, max_steps, sampler=None, keep_paths=0):
+    """
+    Те же траектории, что simulate_trajectory (те же вызовы random), но без
+    списка состояний: генератор отдаёт TrajectorySummary по одной. Путь
+    сохраняется только у первых keep_paths траекторий — массивом uint16
+    (uint32, если состояний больше 65536). Память не зависит от числа траекторий.
+    """
+    n = len(matrix)
+    path_dtype = np.uint16 if n <= 1 << 16 else np.uint32
+    for index in range(n_trajectories):
+        state = start = random.randint(0, n - 1)
+        visits = {state: 1}
+        path = [state] if index < keep_paths else None
+        steps = 0
+        while state != absorbing and steps < max_steps:
+            state = sampler.sample(state) if sampler is not None else next_state(matrix[state])
+            visits[state] = visits.get(state, 0) + 1
+            if path is not None:
+                path.append(state)
+            steps += 1
+        if path is not None:
+            path = np.array(path, dtype=path_dtype)
+        yield TrajectorySummary(start, state, steps, visits, path)
+
+# Основная симуляция (при запуске скрипта; при импорте — только функции)
+def main():
+    # Графики и scipy.stats нужны только скрипту — не грузим их при импорте функций
+    import matplotlib.pyplot as plt
+    from scipy import stats
+
+    random.seed(42)
+    transition_matrix = generate_transition_matrix(N_STATES, ABSORBING_STATE)
+
+    absorption_times = []
+    all_final_states = []
+
+    print(f"Запуск {N_TRAJECTORIES} траекторий...")
+    if ENGINE == "batch":
+        # Свой поток NumPy с тем же сидом — результаты не совпадают с "loop" поштучно,
+        # но распределения те же
+        from markov_batch import simulate_batch
+        absorption_times, all_final_states = simulate_batch(
+            transition_matrix, ABSORBING_STATE, N_TRAJECTORIES, MAX_STEPS, rng=42)
+    else:
+        sampler = None
+        if SAMPLER == "alias":
+            from alias_sampler import AliasSampler
+            sampler = AliasSampler(transition_matrix)
+        # Пути не нужны — только итоги траекторий, память не растёт с их длиной
+        for summary in iter_summaries(transition_matrix, ABSORBING_STATE, N_TRAJECTORIES, MAX_STEPS, sampler):
+            absorption_times.append(summary.steps)
+            all_final_states.append(summary.final)
+
+    # Вывод статистики
+    absorption_times = np.array(absorption_times)
+    final_counts = np.bincount(all_final_states, minlength=N_STATES)
+
+    print("\n" + "="*60)
+    print("РЕЗУЛЬТАТЫ МОДЕЛИРОВАНИЯ ЦЕПИ МАРКОВА")
+    print("="*60)
+    print(f"Поглощающее состояние: {ABSORBING_STATE}")
+    print(f"Траекторий: {N_TRAJECTORIES}")
+    print(f"Попало в поглощающее: {np.sum(np.array(all_final_states) == ABSORBING_STATE)}")
+    print(f"Среднее время до поглощения: {absorption_times.mean():.2f} шагов")
+    print(f"Медиана: {np.median(absorption_times):.2f}")
+    print(f"Мин: {absorption_times.min()}, Макс: {absorption_times.max()}")
+    print(f"Не попало за {MAX_STEPS} шагов: {np.sum(absorption_times == MAX_STEPS)}")
+
+    # Точные значения через фундаментальную матрицу — проверка Монте-Карло
+    from markov_exact import expected_absorption_times, truncated_mean
+    exact_times = expected_absorption_times(transition_matrix, ABSORBING_STATE)
+    print(f"Точное среднее время (фундаментальная матрица): {exact_times.mean():.2f} шагов")
+    print(f"Точное среднее с обрезкой на {MAX_STEPS} шагах: "
+          f"{truncated_mean(transition_matrix, ABSORBING_STATE, MAX_STEPS):.2f}")
+
+    # Графики
+    fig = plt.figure(figsize=(15, 10))
+
+    # 1. Пример траектории
+    ax1 = fig.add_subplot(2, 2, 1)
+    sample_traj = next(iter_summaries(transition_matrix, ABSORBING_STATE, 1, MAX_STEPS, keep_paths=1)).path
+    ax1.plot(sample_traj, 'b-o', markersize=3, linewidth=1)
+    ax1.axhline(y=ABSORBING_STATE, color='r', linestyle='--', label=f'Поглощающее ({ABSORBING_STATE})')
+    ax1.set_title("Пример траектории")
+    ax1.set_xlabel("Шаг")
+    ax1.set_ylabel("Состояние")
+    ax1.legend()
+
+    # 2. Частоты финальных состояний
+    ax2 = fig.add_subplot(2, 2, 2)
+    ax2.bar(range(N_STATES), final_counts, color='skyblue', edgecolor='black')
+    ax2.bar(ABSORBING_STATE, final_counts[ABSORBING_STATE], color='red')
+    ax2.set_title("Частоты финальных состояний")
+    ax2.set_xlabel("Состояние")
+    ax2.set_ylabel("Количество траекторий")
+
+    # 3. Гистограмма времени до поглощения
+    ax3 = fig.add_subplot(2, 2, 3)
+    successful_times = absorption_times[absorption_times < MAX_STEPS]
+    ax3.hist(successful_times, bins=30, color='lightgreen', edgecolor='black')
+    ax3.set_title("Гистограмма времени до поглощения")
+    ax3.set_xlabel("Шаги")
+    ax3.set_ylabel("Частота")
+
+    # 4. График переходов (матрица)
+    ax4 = fig.add_subplot(2, 2, 4)
+    im = ax4.imshow(transition_matrix, cmap='Blues', aspect='auto')
+    ax4.set_title("Матрица переходных вероятностей")
+    ax4.set_xlabel("След. состояние")
+    ax4.set_ylabel("Тек. состояние")
+    plt.colorbar(im, ax=ax4, label="Вероятность")
+
+    plt.tight_layout()
+    plt.show()
+
+    # === scipy.stats.describe ===
+    if len(successful_times) > 0:
+        desc = stats.describe(successful_times)
+        print("\nСТАТИСТИКА (scipy.stats.describe):")
+        print(f"  N: {desc.nobs}")
+        print(f"  Среднее: {desc.mean:.2f}")
+        print(f"  Дисперсия: {desc.variance:.2f}")
+        print(f"  Асимметрия: {desc.skewness:.2f}")
+        print(f"  Эксцесс: {desc.kurtosis:.2f}")
+
+
+if __name__ == "__main__":
+    main()
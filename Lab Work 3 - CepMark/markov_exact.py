@@ -0,0 +1,83 @@
+# Точный анализ поглощающей цепи через фундаментальную матрицу
+# Q — блок переходов между непоглощающими состояниями. Среднее время до
+# поглощения из каждого состояния — решение (I - Q) t = 1, распределение
+# времени — повторные умножения вектора на разреженную Q. Всё на scipy.sparse,
+# поэтому годится и для цепей на 10^5+ состояний
+
+import numpy as np
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
+
+from markov_batch import absorbing_mask
+
+
+def transient_block(matrix, absorbing):
+    """
+    Разреженная Q (переходы между непоглощающими состояниями) и номера
+    этих состояний. matrix — список строк, массив или scipy.sparse;
+    absorbing — номер или набор номеров поглощающих состояний.
+    """
+    P = sp.csr_matrix(matrix, dtype=np.float64)
+    transient = np.flatnonzero(~absorbing_mask(P.shape[0], absorbing))
+    Q = P[transient][:, transient].tocsc()
+    return Q, transient
+
+
+# До скольких непоглощающих состояний "auto" решает прямым методом
+DIRECT_LIMIT = 5000
+
+
+def expected_absorption_times(matrix, absorbing, method: str = "auto") -> np.ndarray:
+    """
+    Среднее число шагов до поглощения из каждого состояния (у поглощающих — 0).
+    method: "direct" — разреженное LU (spsolve), "iterative" — BiCGSTAB
+    (у цепей со случайными переходами LU сильно заполняется, итерации — секунды
+    на 10^5 состояний), "auto" — прямой до DIRECT_LIMIT состояний, иначе итерации.
+    """
+    Q, transient = transient_block(matrix, absorbing)
+    if method == "auto":
+        method = "direct" if Q.shape[0] <= DIRECT_LIMIT else "iterative"
+    A = sp.identity(Q.shape[0], format="csc") - Q
+    ones = np.ones(Q.shape[0])
+    if method == "direct":
+        t = spla.spsolve(A, ones)
+    elif method == "iterative":
+        t, info = spla.bicgstab(A, ones, rtol=1e-10, maxiter=10 * Q.shape[0])
+        if info != 0:
+            raise RuntimeError(f"BiCGSTAB не сошёлся (info={info})")
+    else:
+        raise ValueError(f"Неизвестный метод {method!r}, ожидается 'direct' или 'iterative'")
+    times = np.zeros(sp.csr_matrix(matrix).shape[0])
+    times[transient] = t
+    return times
+
+
+def absorption_time_distribution(matrix, absorbing, horizon: int, start=None):
+    """
+    P(T = k) для k = 0..horizon и хвост P(T > horizon).
+    start — начальное распределение по всем состояниям;
+    по умолчанию равномерное, как в simulate_trajectory.
+    """
+    P = sp.csr_matrix(matrix, dtype=np.float64)
+    n = P.shape[0]
+    Q, transient = transient_block(P, absorbing)
+    start = np.full(n, 1.0 / n) if start is None else np.asarray(start, dtype=np.float64)
+
+    # Масса в непоглощающих состояниях: v_k = v_{k-1} Q (строка на матрицу → Q^T v)
+    QT = Q.T.tocsr()
+    v = start[transient]
+    survival = np.empty(horizon + 1)  # P(T > k)
+    survival[0] = v.sum()
+    for k in range(1, horizon + 1):
+        v = QT @ v
+        survival[k] = v.sum()
+    pmf = np.empty(horizon + 1)
+    pmf[0] = 1.0 - survival[0]
+    pmf[1:] = survival[:-1] - survival[1:]
+    return pmf, survival[-1]
+
+
+def truncated_mean(matrix, absorbing, max_steps: int, start=None) -> float:
+    # E[min(T, max_steps)] — то, что оценивает Монте-Карло с обрезкой MAX_STEPS
+    pmf, tail = absorption_time_distribution(matrix, absorbing, max_steps - 1, start)
+    return float((pmf * np.arange(max_steps)).sum() + tail * max_steps)
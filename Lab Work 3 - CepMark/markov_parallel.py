@@ -0,0 +1,122 @@
+# Эксперимент с поглощающей цепью на нескольких процессах
+# Траектории делятся на фиксированное число частей (shards), у каждой части свой
+# дочерний SeedSequence мастер-сида. Части считаются пакетным движком
+# (markov_batch.py) в процессах пула, которые читают одну копию накопленной
+# матрицы и направляющей таблицы из разделяемой памяти. От частей возвращаются
+# только гистограммы, их сумма не зависит от числа процессов
+
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+
+from markov_batch import cumulative_matrix, guide_table, absorbing_mask, simulate_prepared
+
+
+# time_counts[k] — траекторий, поглощённых за k шагов (k = 0..max_steps-1);
+# time_counts[max_steps] — поглощённых ровно на max_steps шаге и не поглощённых
+# (как в simulate_batch, время max_steps); final_counts[i] — траекторий,
+# закончившихся в состоянии i
+ExperimentResult = namedtuple("ExperimentResult", "time_counts final_counts absorbed")
+
+# Число частей по умолчанию: от него (а не от числа процессов) зависят потоки
+SHARDS = 64
+
+
+def shard_sizes(n_trajectories: int, shards: int):
+    # Траектории поровну, первые части — на одну больше
+    base, extra = divmod(n_trajectories, shards)
+    return [base + (i < extra) for i in range(shards)]
+
+
+# Таблицы в процессе-исполнителе: открываются один раз при старте процесса
+_tables = {}
+
+
+def _share(arrays: dict):
+    # Копии массивов в разделяемой памяти; возвращает сегменты и их описание
+    segments, spec = [], {}
+    for name, array in arrays.items():
+        segment = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        np.ndarray(array.shape, array.dtype, buffer=segment.buf)[...] = array
+        segments.append(segment)
+        spec[name] = (segment.name, array.shape, array.dtype.str)
+    return segments, spec
+
+
+def _attach(spec: dict):
+    # Инициализатор процесса пула: массивы поверх чужих сегментов, без копирования
+    for name, (segment_name, shape, dtype) in spec.items():
+        segment = shared_memory.SharedMemory(name=segment_name)
+        _tables[name] = (segment, np.ndarray(shape, dtype, buffer=segment.buf))
+
+
+def _run_shard(task):
+    size, seed, max_steps = task
+    cumulative = _tables["cumulative"][1]
+    times, finals = simulate_prepared(cumulative, _tables["guide"][1], _tables["absorbing"][1],
+                                      size, max_steps, rng=seed)
+    absorbed = int(_tables["absorbing"][1][finals].sum())
+    return (np.bincount(times, minlength=max_steps + 1),
+            np.bincount(finals, minlength=cumulative.shape[0]), absorbed)
+
+
+def run_experiment(matrix, absorbing, n_trajectories: int, max_steps: int,
+                   seed: int = 0, workers: int = 1, shards: int = SHARDS) -> ExperimentResult:
+    """
+    n_trajectories траекторий со стартом, равномерным по всем состояниям.
+    matrix — матрица переходов (список строк или массив), absorbing — номер
+    или набор номеров поглощающих состояний. Результат одинаков при любом
+    workers: потоки случайных чисел привязаны к частям, а не к процессам.
+    """
+    cumulative = cumulative_matrix(matrix)
+    arrays = dict(cumulative=cumulative, guide=guide_table(cumulative),
+                  absorbing=absorbing_mask(cumulative.shape[0], absorbing))
+    seeds = np.random.SeedSequence(seed).spawn(shards)
+    tasks = [(size, s, max_steps) for size, s in zip(shard_sizes(n_trajectories, shards), seeds)]
+
+    time_counts = np.zeros(max_steps + 1, dtype=np.int64)
+    final_counts = np.zeros(cumulative.shape[0], dtype=np.int64)
+    absorbed = 0
+    if workers > 1:
+        segments, spec = _share(arrays)
+        try:
+            with ProcessPoolExecutor(workers, initializer=_attach, initargs=(spec,)) as pool:
+                results = list(pool.map(_run_shard, tasks))
+        finally:
+            for segment in segments:
+                segment.close()
+                segment.unlink()
+    else:
+        _tables.update({name: (None, array) for name, array in arrays.items()})
+        try:
+            results = [_run_shard(task) for task in tasks]
+        finally:
+            _tables.clear()
+    # Сумма в порядке частей — точное совпадение при любом числе процессов
+    for times, finals, count in results:
+        time_counts += times
+        final_counts += finals
+        absorbed += count
+    return ExperimentResult(time_counts, final_counts, absorbed)
+
+
+def mean_time(result: ExperimentResult) -> float:
+    # Среднее время до поглощения (не поглощённые — max_steps), как absorption_times.mean()
+    steps = np.arange(len(result.time_counts))
+    return float((steps * result.time_counts).sum() / result.time_counts.sum())
+
+
+def main():
+    from markov_absorbing import N_STATES, ABSORBING_STATE, MAX_STEPS, generate_transition_matrix
+    import random
+    random.seed(42)
+    matrix = generate_transition_matrix(N_STATES, ABSORBING_STATE)
+    result = run_experiment(matrix, ABSORBING_STATE, 1_000_000, MAX_STEPS, seed=42, workers=4)
+    total = result.time_counts.sum()
+    print(f"Траекторий: {total}, поглощено: {result.absorbed}")
+    print(f"Среднее время до поглощения: {mean_time(result):.2f} шагов")
+
+
+if __name__ == "__main__":
+    main()
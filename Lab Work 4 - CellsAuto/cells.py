@@ -1,5 +1,9 @@
-import tkinter as tk
-import random
+import numpy as np
+
+try:
+    import tkinter as tk
+except ImportError:  # Без Tk работают модель и ансамбли (ensemble.py), но не GUI
+    tk = None
 
 # Параментры модели
 
@@ -10,87 +14,203 @@ DELAY = 300
 
 INFECTION_PROB = 0.3     # вероятность заражения
 RECOVERY_TIME = 10       # шагов до выздоровления
+INITIAL_INFECTED = 10    # заражённых в начале
 
 # Состояния
 SUSCEPTIBLE = 0  # здоров
 INFECTED = 1     # заражён
 RECOVERED = 2    # выздоровел
 
+# Способы расчёта шага
+ENGINE_DENSE = "dense"          # всё поле масками NumPy
+ENGINE_FRONTIER = "frontier"    # только заражённые и их здоровые соседи
+
+# Окрестность Мура: сдвиги (строка, столбец)
+MOORE = [(di, dj) for di in (-1, 0, 1) for dj in (-1, 0, 1) if di or dj]
+
 
 # Клеточный автомат
 
 class EpidemicModel:
     """
-    Клеточный автомат распространения эпидемии
+    Клеточный автомат распространения эпидемии.
+    grid и infection_time — массивы NumPy. engine="dense" считает шаг сразу
+    по всему полю, engine="frontier" — только по фронту эпидемии
     """
 
     # Начальное состояние
-    def __init__(self, rows: int, cols: int):
+    def __init__(self, rows: int, cols: int, seed=None, engine: str = ENGINE_DENSE,
+                 infection_prob: float = INFECTION_PROB, recovery_time: int = RECOVERY_TIME,
+                 initial_infected: int = INITIAL_INFECTED):
+        if engine not in (ENGINE_DENSE, ENGINE_FRONTIER):
+            raise ValueError(f"Неизвестный способ расчёта {engine!r}")
         self.rows = rows
         self.cols = cols
+        self.engine = engine
+        self.infection_prob = infection_prob
+        self.recovery_time = recovery_time
+        self.rng = np.random.default_rng(seed)
 
         # Основное поле состояний
-        self.grid = [[SUSCEPTIBLE for _ in range(cols)]
-                     for _ in range(rows)]
+        self.grid = np.full((rows, cols), SUSCEPTIBLE, dtype=np.uint8)
+
+        # Время заражения для каждой клетки (растёт только до recovery_time)
+        self.infection_time = np.zeros((rows, cols), dtype=np.uint16)
+
+        # Инициализация: несколько заражённых (клетки могут совпасть, как и раньше)
+        self.grid[self.rng.integers(0, rows, initial_infected),
+                  self.rng.integers(0, cols, initial_infected)] = INFECTED
 
-        # Время заражения для каждой клетки
-        self.infection_time = [[0 for _ in range(cols)]
-                               for _ in range(rows)]
+        # Изменившиеся на последнем шаге клетки (маска или номера); None — до первого шага
+        self._changed = None
 
-        # Инициализация: несколько заражённых
-        for _ in range(10):
-            i = random.randint(0, rows - 1)
-            j = random.randint(0, cols - 1)
-            self.grid[i][j] = INFECTED
+        if engine == ENGINE_FRONTIER:
+            self.reset_frontier()
 
     # Подсчет количества заболевших соседей в окрестности Мура
     def count_infected_neighbors(self, row: int, col: int) -> int:
-        count = 0
-        for i in range(row - 1, row + 2):
-            for j in range(col - 1, col + 2):
-                if i == row and j == col:
-                    continue
-                if 0 <= i < self.rows and 0 <= j < self.cols:
-                    if self.grid[i][j] == INFECTED:
-                        count += 1
-        return count
+        window = self.grid[max(row - 1, 0):row + 2, max(col - 1, 0):col + 2]
+        return int(np.count_nonzero(window == INFECTED)) - (self.grid[row, col] == INFECTED)
+
+    # Есть ли у клетки хотя бы один заражённый сосед — для всего поля сразу
+    def exposed(self, infected: np.ndarray) -> np.ndarray:
+        # Окрестность Мура раскладывается на сдвиги по строкам и по столбцам;
+        # сама клетка тоже попадает в маску, но для здоровых это ничего не меняет
+        rows = infected.copy()
+        rows[:, 1:] |= infected[:, :-1]
+        rows[:, :-1] |= infected[:, 1:]
+        near = rows.copy()
+        near[1:] |= rows[:-1]
+        near[:-1] |= rows[1:]
+        return near
+
+    # Число заражённых соседей у каждой клетки поля
+    def neighbor_counts(self) -> np.ndarray:
+        infected = (self.grid == INFECTED).view(np.uint8)
+        rows = infected.copy()
+        rows[:, 1:] += infected[:, :-1]
+        rows[:, :-1] += infected[:, 1:]
+        counts = rows.copy()
+        counts[1:] += rows[:-1]
+        counts[:-1] += rows[1:]
+        return counts - infected
+
+    # Номера (в развёрнутом поле) соседей клеток cells, с повторами
+    def neighbors(self, cells: np.ndarray) -> np.ndarray:
+        row, col = np.divmod(cells, self.cols)
+        found = []
+        for di, dj in MOORE:
+            r, c = row + di, col + dj
+            inside = (r >= 0) & (r < self.rows) & (c >= 0) & (c < self.cols)
+            found.append(r[inside] * self.cols + c[inside])
+        return np.concatenate(found)
+
+    # Фронт заново по полю — после ручной правки grid в режиме "frontier"
+    def reset_frontier(self):
+        self.counts = self.neighbor_counts()
+        self.infected = np.flatnonzero(self.grid == INFECTED)
+        self.frontier = np.flatnonzero((self.grid == SUSCEPTIBLE) & (self.counts > 0))
+
+    # Номера (в развёрнутом поле) клеток, изменившихся на последнем шаге
+    @property
+    def changed(self):
+        if self._changed is not None and self._changed.dtype == bool:
+            self._changed = np.flatnonzero(self._changed)
+        return self._changed
 
     # Один шаг моделирования
     def next_step(self):
-        new_grid = [row[:] for row in self.grid]
+        if self.engine == ENGINE_FRONTIER:
+            self._step_frontier()
+        else:
+            self._step_dense()
+
+    def _step_dense(self):
+        infected = self.grid == INFECTED
+
+        # Здоровая может заразиться: одно случайное число на каждую здоровую клетку
+        # с заражёнными соседями (порядок розыгрыша иной, чем у поклеточного обхода,
+        # вероятности те же)
+        infect = (self.grid == SUSCEPTIBLE) & self.exposed(infected)
+        draws = self.rng.random(np.count_nonzero(infect), dtype=np.float32)
+        infect[infect] = draws < self.infection_prob
+
+        # Зараженная выздоравливает и больше не заражается
+        self.infection_time += infected
+        recover = infected & (self.infection_time >= self.recovery_time)
+
+        # Коды состояний идут подряд: S + 1 = I, I + 1 = R. У здоровых infection_time
+        # и так 0 — они ещё не болели
+        self.grid += infect
+        self.grid += recover
+        self._changed = infect | recover  # Номера — только по запросу changed
+
+    def _step_frontier(self):
+        """
+        Тот же шаг, но только по заражённым (infected) и здоровым клеткам с
+        заражёнными соседями (frontier); оба списка — номера в развёрнутом
+        поле по возрастанию. Число заражённых соседей (counts) обновляется
+        по заболевшим и выздоровевшим клеткам. Случайные числа разыгрываются
+        в том же порядке, что и в "dense", — при одном seed поля совпадают
+        """
+        grid = self.grid.reshape(-1)
+        timer = self.infection_time.reshape(-1)
+        counts = self.counts.reshape(-1)
+
+        draws = self.rng.random(len(self.frontier), dtype=np.float32)
+        hit = draws < self.infection_prob
+        infect, waiting = self.frontier[hit], self.frontier[~hit]
+
+        timer[self.infected] += 1
+        done = timer[self.infected] >= self.recovery_time
+        recover, still = self.infected[done], self.infected[~done]
+
+        grid[infect] = INFECTED
+        grid[recover] = RECOVERED
+        self._changed = np.concatenate((infect, recover))
+        around = self.neighbors(infect)
+        np.add.at(counts, around, 1)
+        np.subtract.at(counts, self.neighbors(recover), 1)
+
+        # Новые кандидаты — только соседи заболевших; у соседей выздоровевших
+        # заражённых вокруг может не остаться
+        self.infected = np.union1d(still, infect)
+        frontier = np.union1d(waiting, around)
+        self.frontier = frontier[(grid[frontier] == SUSCEPTIBLE) & (counts[frontier] > 0)]
 
-        for i in range(self.rows):
-            for j in range(self.cols):
 
-                # Здоровья может заразиться
-                if self.grid[i][j] == SUSCEPTIBLE:
-                    infected_neighbors = self.count_infected_neighbors(i, j)
-                    if infected_neighbors > 0:
-                        if random.random() < INFECTION_PROB:
-                            new_grid[i][j] = INFECTED
-                            self.infection_time[i][j] = 0
-
-                # Зараженная выздоравливает и больше не заражается
-                elif self.grid[i][j] == INFECTED:
-                    self.infection_time[i][j] += 1
-                    if self.infection_time[i][j] >= RECOVERY_TIME:
-                        new_grid[i][j] = RECOVERED
+# Визуализация
 
-        self.grid = new_grid
+COLORS = ("white", "red", "green")  # По коду состояния
+# Те же цвета для картинки (green в Tk — #008000)
+PALETTE = np.array([(255, 255, 255), (255, 0, 0), (0, 128, 0)], dtype=np.uint8)
 
+RECT_LIMIT = 10_000    # До стольких клеток — прямоугольники на холсте, больше — картинка
+REDRAW_LIMIT = 5_000   # Больше изменений за шаг — картинка собирается заново целиком
+MAX_CANVAS = 1000      # Картинка масштабируется не больше, чем до такого размера
 
-# Визуализация
 
 class EpidemicGUI:
+    """
+    Кадр перерисовывает только клетки из model.changed. Небольшие поля —
+    прямоугольники, созданные один раз; большие — картинка PhotoImage,
+    собранная из массива состояний (клетка — cell_size × cell_size пикселей)
+    """
 
-    def __init__(self, root: tk.Tk, model: EpidemicModel):
+    def __init__(self, root: "tk.Tk", model: EpidemicModel, cell_size: int = CELL_SIZE):
         self.root = root
         self.model = model
+        self.use_image = model.rows * model.cols > RECT_LIMIT
+        if self.use_image:
+            cell_size = max(1, min(cell_size, MAX_CANVAS // max(model.rows, model.cols)))
+        self.cell_size = cell_size
+        self.items = None  # Прямоугольники клеток по номерам в развёрнутом поле
+        self.photo = None
 
         self.canvas = tk.Canvas(
             root,
-            width=COLS * CELL_SIZE,
-            height=ROWS * CELL_SIZE,
+            width=model.cols * cell_size,
+            height=model.rows * cell_size,
             bg="white"
         )
         self.canvas.pack()
@@ -98,29 +218,54 @@ class EpidemicGUI:
         self.update()
 
     def draw(self):
-        self.canvas.delete("all")
-
-        for i in range(self.model.rows):
-            for j in range(self.model.cols):
-                x1 = j * CELL_SIZE
-                y1 = i * CELL_SIZE
-                x2 = x1 + CELL_SIZE
-                y2 = y1 + CELL_SIZE
-
-                state = self.model.grid[i][j]
-
-                if state == SUSCEPTIBLE:
-                    color = "white"
-                elif state == INFECTED:
-                    color = "red"
-                else:
-                    color = "green"
-
-                self.canvas.create_rectangle(
-                    x1, y1, x2, y2,
-                    fill=color,
-                    outline="gray"
-                )
+        changed = self.model.changed
+        if self.use_image:
+            self.draw_image(changed)
+        else:
+            self.draw_cells(changed)
+
+    def draw_cells(self, changed):
+        cells = self.model.grid.reshape(-1)
+        if self.items is None:
+            # Прямоугольники создаются один раз, дальше меняется только цвет
+            size = self.cell_size
+            self.items = []
+            for i in range(self.model.rows):
+                for j in range(self.model.cols):
+                    x1 = j * size
+                    y1 = i * size
+                    self.items.append(self.canvas.create_rectangle(
+                        x1, y1, x1 + size, y1 + size,
+                        fill=COLORS[cells[i * self.model.cols + j]],
+                        outline="gray"
+                    ))
+            return
+        for index in changed.tolist():
+            self.canvas.itemconfigure(self.items[index], fill=COLORS[cells[index]])
+
+    def image_data(self) -> bytes:
+        # Всё поле как PPM: цвет клетки по палитре, увеличение повтором пикселей
+        rgb = PALETTE[self.model.grid]
+        if self.cell_size > 1:
+            rgb = rgb.repeat(self.cell_size, axis=0).repeat(self.cell_size, axis=1)
+        height, width = rgb.shape[:2]
+        return f"P6 {width} {height} 255 ".encode() + rgb.tobytes()
+
+    def draw_image(self, changed):
+        if self.photo is None or changed is None or len(changed) > REDRAW_LIMIT:
+            data = self.image_data()
+            if self.photo is None:
+                self.photo = tk.PhotoImage(data=data, format="PPM")
+                self.canvas.create_image(0, 0, image=self.photo, anchor="nw")
+            else:
+                self.photo.configure(data=data, format="PPM")
+            return
+        # Немного изменений — закрашиваем только их
+        size = self.cell_size
+        cells = self.model.grid.reshape(-1)
+        for index in changed.tolist():
+            i, j = divmod(index, self.model.cols)
+            self.photo.put(COLORS[cells[index]], to=(j * size, i * size, (j + 1) * size, (i + 1) * size))
 
     def update(self):
         self.draw()
@@ -0,0 +1,135 @@
+# Ансамбль реализаций эпидемии без графического интерфейса
+# Каждая реализация — EpidemicModel со своим дочерним SeedSequence мастер-сида;
+# считается до исчезновения заражённых (или до max_steps), хранятся только
+# численности S/I/R по шагам. Реализации раздаются процессам пула, номера
+# потоков привязаны к реализациям — результат не зависит от числа процессов
+
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+from cells import (EpidemicModel, ENGINE_DENSE, INFECTED, RECOVERED,
+                   INFECTION_PROB, RECOVERY_TIME, INITIAL_INFECTED)
+
+
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+def run_realisation(params: dict, seed) -> np.ndarray:
+    """
+    Одна реализация: массив (шаги + 1) × 3 с числом клеток S, I, R
+    до первого шага и после каждого. Численности пересчитываются только
+    по изменившимся клеткам (model.changed), без обхода поля.
+    """
+    params = dict(params)
+    max_steps = params.pop("max_steps")
+    model = EpidemicModel(**params, seed=seed)
+    size = model.rows * model.cols
+    infected = int(np.count_nonzero(model.grid == INFECTED))
+    recovered = 0
+    counts = [(size - infected, infected, recovered)]
+    cells = model.grid.reshape(-1)
+    for _ in range(max_steps):
+        if infected == 0:
+            break
+        model.next_step()
+        changed = cells[model.changed]
+        # Изменившаяся клетка либо заболела (S → I), либо выздоровела (I → R)
+        gone = int(np.count_nonzero(changed == RECOVERED))
+        infected += len(changed) - 2 * gone
+        recovered += gone
+        counts.append((size - infected - recovered, infected, recovered))
+    return np.array(counts, dtype=np.int32)
+
+
+def _run_task(task):
+    params, seed = task
+    return run_realisation(params, seed)
+
+
+def run_ensemble(
+    n_runs: int,
+    rows: int = 100,
+    cols: int = 100,
+    infection_prob: float = INFECTION_PROB,
+    recovery_time: int = RECOVERY_TIME,
+    initial_infected: int = INITIAL_INFECTED,
+    max_steps: int = 10_000,
+    master_seed: int = 0,
+    workers: int = 1,
+    engine: str = ENGINE_DENSE
+) -> dict:
+    """
+    n_runs реализаций. Результат:
+    counts — int32-массив n_runs × шаги × 3 (S, I, R); после окончания
+    реализации численности повторяют последние значения;
+    steps — длительность каждой реализации; attack — доля переболевших клеток.
+    engine="frontier" выгоден на больших полях с небольшими очагами; на полях
+    порядка 100 × 100 фронт занимает заметную часть поля, и "dense" быстрее.
+    """
+    params = dict(rows=rows, cols=cols, infection_prob=infection_prob,
+                  recovery_time=recovery_time, initial_infected=initial_infected,
+                  max_steps=max_steps, engine=engine)
+    tasks = [(params, np.random.SeedSequence(master_seed, spawn_key=(i,))) for i in range(n_runs)]
+    if workers > 1:
+        with ProcessPoolExecutor(workers) as pool:
+            runs = list(pool.map(_run_task, tasks, chunksize=max(1, n_runs // (4 * workers))))
+    else:
+        runs = [_run_task(task) for task in tasks]
+
+    steps = np.array([len(run) - 1 for run in runs], dtype=np.int32)
+    counts = np.empty((n_runs, steps.max() + 1, 3), dtype=np.int32)
+    for i, run in enumerate(runs):
+        counts[i, :len(run)] = run
+        counts[i, len(run):] = run[-1]
+    size = rows * cols
+    # Переболевшие — выздоровевшие и ещё больные, если прогон упёрся в max_steps
+    attack = (counts[:, -1, 1] + counts[:, -1, 2]) / size
+    return {"counts": counts, "steps": steps, "attack": attack, "size": size}
+
+
+def quantile_bands(counts: np.ndarray, quantiles=QUANTILES) -> np.ndarray:
+    # Полосы по ансамблю: len(quantiles) × шаги × 3
+    return np.quantile(counts, quantiles, axis=0)
+
+
+def print_ensemble(result: dict, quantiles=QUANTILES):
+    counts = result["counts"]
+    peak = counts[:, :, 1].max(axis=1)
+    print("=" * 60)
+    print(f"АНСАМБЛЬ РЕАЛИЗАЦИЙ: {len(counts)}, клеток в поле: {result['size']}")
+    print("=" * 60)
+    header = "  ".join(f"q{round(q * 100):02d}".rjust(8) for q in quantiles)
+    print(f"{'':22s}{header}")
+    for name, values in (("Доля переболевших", result["attack"]),
+                         ("Пик заражённых", peak),
+                         ("Длительность, шагов", result["steps"])):
+        row = "  ".join(f"{v:8.3f}" if name.startswith("Доля") else f"{v:8.0f}"
+                        for v in np.quantile(values, quantiles))
+        print(f"  {name:20s}{row}")
+
+
+def plot_bands(result: dict, quantiles=QUANTILES):
+    # Медиана и крайние полосы S/I/R по шагам
+    import matplotlib.pyplot as plt
+    bands = quantile_bands(result["counts"], quantiles)
+    steps = np.arange(bands.shape[1])
+    middle = len(quantiles) // 2
+    fig, ax = plt.subplots(figsize=(10, 5))
+    for k, (name, color) in enumerate((("S", "gray"), ("I", "red"), ("R", "green"))):
+        ax.fill_between(steps, bands[0, :, k], bands[-1, :, k], color=color, alpha=0.2)
+        ax.plot(steps, bands[middle, :, k], color=color, label=name)
+    ax.set_xlabel("Шаг")
+    ax.set_ylabel("Клеток")
+    ax.set_title(f"Ансамбль: медиана и полоса {quantiles[0]:.0%}–{quantiles[-1]:.0%}")
+    ax.legend()
+    plt.tight_layout()
+    plt.show()
+
+
+def main():
+    result = run_ensemble(1000, rows=100, cols=100, master_seed=42, workers=4)
+    print_ensemble(result)
+
+
+if __name__ == "__main__":
+    main()
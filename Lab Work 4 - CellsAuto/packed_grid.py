@@ -0,0 +1,181 @@
+# Компактное поле клеточного автомата: одна клетка — один байт
+# Младшие 2 бита — состояние (S/I/R), старшие 6 — время заражения (до 63 шагов).
+# Поле может лежать в файле (np.memmap): шаг идёт полосами строк с ореолом
+# в одну строку сверху и снизу, в памяти — только текущая полоса, поэтому
+# поле может быть больше оперативной памяти. Файл поля — заголовок и байты
+# клеток — сам является снимком: сохраняется и открывается без преобразований
+
+import shutil
+import struct
+import numpy as np
+
+from cells import SUSCEPTIBLE, INFECTED, INFECTION_PROB, RECOVERY_TIME
+
+
+STATE_MASK = 0b11
+TIMER_SHIFT = 2
+MAX_TIMER = 0xFF >> TIMER_SHIFT  # 63
+
+MAGIC = b"CELLPACK"
+VERSION = 2
+# Заголовок: сигнатура, версия, строки, столбцы, номер шага, вероятность
+# заражения, время выздоровления; дополнен до 64 байт
+HEADER = struct.Struct("<8sIQQQdI")
+HEADER_SIZE = 64
+
+
+def pack(grid: np.ndarray, infection_time: np.ndarray) -> np.ndarray:
+    # Поле и время заражения EpidemicModel → байт на клетку
+    if infection_time.max(initial=0) > MAX_TIMER:
+        raise ValueError(f"время заражения больше {MAX_TIMER} не помещается в 6 бит")
+    return (infection_time.astype(np.uint8) << TIMER_SHIFT) | grid.astype(np.uint8)
+
+
+def unpack(cells: np.ndarray):
+    # Байт на клетку → (состояния, время заражения)
+    return cells & STATE_MASK, cells >> TIMER_SHIFT
+
+
+class PackedGrid:
+    """
+    Поле rows × cols в памяти (path=None) или в файле path. Существующий
+    файл открывается PackedGrid.open — как есть, через отображение в память.
+    infection_prob и recovery_time — параметры модели для step; хранятся
+    в заголовке файла вместе с полем.
+    """
+
+    def __init__(self, rows: int, cols: int, path: str = None,
+                 infection_prob: float = INFECTION_PROB, recovery_time: int = RECOVERY_TIME):
+        if recovery_time > MAX_TIMER:
+            raise ValueError(f"recovery_time больше {MAX_TIMER} не помещается в 6 бит")
+        self.rows = rows
+        self.cols = cols
+        self.path = path
+        self.step_count = 0
+        self.infection_prob = infection_prob
+        self.recovery_time = recovery_time
+        if path is None:
+            self.cells = np.full((rows, cols), SUSCEPTIBLE, dtype=np.uint8)
+        else:
+            with open(path, "w+b") as f:
+                f.truncate(HEADER_SIZE + rows * cols)  # Нули — все здоровы
+            self._write_header()
+            self.cells = np.memmap(path, dtype=np.uint8, mode="r+", offset=HEADER_SIZE,
+                                   shape=(rows, cols))
+
+    @classmethod
+    def open(cls, path: str, mode: str = "r+") -> "PackedGrid":
+        with open(path, "rb") as f:
+            header = f.read(HEADER_SIZE).ljust(HEADER_SIZE, b"\0")
+        magic, version, rows, cols, step_count, infection_prob, recovery_time = HEADER.unpack_from(header)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path}: не поле клеточного автомата или другая версия формата")
+        grid = cls.__new__(cls)
+        grid.rows, grid.cols, grid.path, grid.step_count = rows, cols, path, step_count
+        grid.infection_prob, grid.recovery_time = infection_prob, recovery_time
+        grid.cells = np.memmap(path, dtype=np.uint8, mode=mode, offset=HEADER_SIZE,
+                               shape=(rows, cols))
+        return grid
+
+    @classmethod
+    def from_model(cls, model, path: str = None) -> "PackedGrid":
+        # Параметры берутся у модели — step повторяет её шаг
+        grid = cls(model.rows, model.cols, path, model.infection_prob, model.recovery_time)
+        grid.cells[...] = pack(model.grid, model.infection_time)
+        return grid
+
+    def seed_infected(self, rng, count: int = 10):
+        # Начальные заражённые — как в EpidemicModel (клетки могут совпасть)
+        rows, cols = rng.integers(0, self.rows, count), rng.integers(0, self.cols, count)
+        self.cells[rows, cols] = INFECTED
+
+    def _header(self) -> bytes:
+        return HEADER.pack(MAGIC, VERSION, self.rows, self.cols, self.step_count,
+                           self.infection_prob, self.recovery_time).ljust(HEADER_SIZE, b"\0")
+
+    def _write_header(self):
+        with open(self.path, "r+b") as f:
+            f.write(self._header())
+
+    def step(self, rng, infection_prob: float = None,
+             recovery_time: int = None, tile_rows: int = 256):
+        """
+        Шаг EpidemicModel полосами по tile_rows строк, на месте. Случайные
+        числа идут в порядке строк, как в режиме "dense", — при одном
+        генераторе результат совпадает с EpidemicModel.next_step.
+        Без infection_prob и recovery_time — параметры поля.
+        """
+        if infection_prob is None:
+            infection_prob = self.infection_prob
+        if recovery_time is None:
+            recovery_time = self.recovery_time
+        if recovery_time > MAX_TIMER:
+            raise ValueError(f"recovery_time больше {MAX_TIMER} не помещается в 6 бит")
+        cells = self.cells
+        above = None  # Старая последняя строка предыдущей полосы — ореол сверху
+        for top in range(0, self.rows, tile_rows):
+            bottom = min(top + tile_rows, self.rows)
+            block = np.array(cells[top:bottom])
+            state = block & STATE_MASK
+
+            # Заражённые полосы с ореолом: строка сверху (старая) и снизу (ещё не тронутая)
+            halo = np.zeros((bottom - top + 2, self.cols), dtype=bool)
+            if above is not None:
+                halo[0] = (above & STATE_MASK) == INFECTED
+            halo[1:-1] = state == INFECTED
+            if bottom < self.rows:
+                halo[-1] = (cells[bottom] & STATE_MASK) == INFECTED
+
+            # Окрестность Мура — сдвиги по столбцам, затем по строкам
+            near = halo.copy()
+            near[:, 1:] |= halo[:, :-1]
+            near[:, :-1] |= halo[:, 1:]
+            exposed = near[:-2] | near[1:-1] | near[2:]
+
+            infected = halo[1:-1]
+            infect = (state == SUSCEPTIBLE) & exposed
+            draws = rng.random(np.count_nonzero(infect), dtype=np.float32)
+            infect[infect] = draws < infection_prob
+
+            timer = (block >> TIMER_SHIFT) + infected
+            recover = infected & (timer >= recovery_time)
+            # Коды состояний идут подряд: S + 1 = I, I + 1 = R
+            state += infect
+            state += recover
+
+            above = block[-1]
+            cells[top:bottom] = (timer << TIMER_SHIFT) | state
+        self.step_count += 1
+
+    def counts(self, tile_rows: int = 4096) -> np.ndarray:
+        # Число клеток S, I, R — полосами, без загрузки поля целиком
+        total = np.zeros(3, dtype=np.int64)
+        for top in range(0, self.rows, tile_rows):
+            state = self.cells[top:top + tile_rows] & STATE_MASK
+            total += np.bincount(state.ravel(), minlength=3)[:3]
+        return total
+
+    def flush(self):
+        if self.path is not None:
+            self.cells.flush()
+            self._write_header()
+
+    def save(self, path: str, tile_rows: int = 4096):
+        # Снимок: тот же формат, что у файла поля
+        if self.path is not None:
+            self.flush()
+            shutil.copyfile(self.path, path)
+            return
+        with open(path, "wb") as f:
+            f.write(self._header())
+            for top in range(0, self.rows, tile_rows):
+                f.write(self.cells[top:top + tile_rows].tobytes())
+
+    @classmethod
+    def load(cls, path: str) -> "PackedGrid":
+        # Снимок в память (для поля в файле — PackedGrid.open)
+        packed = cls.open(path, mode="r")
+        grid = cls(packed.rows, packed.cols, None, packed.infection_prob, packed.recovery_time)
+        grid.cells[...] = packed.cells
+        grid.step_count = packed.step_count
+        return grid